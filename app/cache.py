@@ -0,0 +1,170 @@
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.models import ServiceType, Barber, BusinessHours
+
+# Catalog rows change rarely; entries expire so other workers pick up edits
+CATALOG_TTL_SECONDS = 30
+# Slot lists are invalidated locally on every booking change; the short TTL
+# bounds how long another worker's bookings can go unseen
+SLOTS_TTL_SECONDS = 10
+# Open/closed status is keyed by the minute, so it only lives that long anyway
+STATUS_TTL_SECONDS = 60
+# Today's birthday list is invalidated locally on customer edits; other workers
+# catch up within this window
+BIRTHDAYS_TTL_SECONDS = 300
+
+# Column snapshots (Row objects), not ORM instances, so nothing is tied to a session
+SERVICE_COLUMNS = (
+    ServiceType.id,
+    ServiceType.name,
+    ServiceType.category,
+    ServiceType.base_price,
+    ServiceType.peak_price,
+    ServiceType.off_peak_price,
+    ServiceType.duration_minutes,
+    ServiceType.is_active,
+)
+BARBER_COLUMNS = (
+    Barber.id,
+    Barber.name,
+    Barber.commission_rate,
+    Barber.specialties,
+    Barber.is_active,
+)
+HOURS_COLUMNS = (
+    BusinessHours.day_of_week,
+    BusinessHours.open_time,
+    BusinessHours.close_time,
+    BusinessHours.is_closed,
+)
+
+_lock = threading.Lock()
+_services = {}
+_barbers = {}
+_hours = {}
+_slots = {}
+_status = {}
+_birthdays = {}
+# Bumped by every invalidation, so a load that raced with one is not stored
+_generation = 0
+
+
+def _lookup(cache: dict, key, load, ttl: int):
+    now = time.monotonic()
+    with _lock:
+        entry = cache.get(key)
+        generation = _generation
+    if entry and entry[0] > now:
+        return entry[1]
+
+    value = load()
+    with _lock:
+        # Skip the store if an invalidation happened while load() was reading
+        if value is not None and generation == _generation:
+            cache[key] = (now + ttl, value)
+    return value
+
+
+def get_service(db: Session, service_id: int):
+    """Cached service catalog row, or None if the service does not exist"""
+    return _lookup(
+        _services,
+        service_id,
+        lambda: db.query(*SERVICE_COLUMNS).filter(ServiceType.id == service_id).first(),
+        CATALOG_TTL_SECONDS,
+    )
+
+
+def get_barber(db: Session, barber_id: int):
+    """Cached barber profile row (not live availability), or None"""
+    return _lookup(
+        _barbers,
+        barber_id,
+        lambda: db.query(*BARBER_COLUMNS).filter(Barber.id == barber_id).first(),
+        CATALOG_TTL_SECONDS,
+    )
+
+
+def get_hours_by_day(db: Session) -> dict:
+    """Cached business hours rows keyed by day_of_week; empty if none are configured"""
+    return _lookup(
+        _hours,
+        "week",
+        lambda: {
+            h.day_of_week: h
+            for h in db.query(*HOURS_COLUMNS).order_by(BusinessHours.day_of_week).all()
+        },
+        CATALOG_TTL_SECONDS,
+    )
+
+
+def get_slots(key: tuple, load):
+    """Cached slot list for (date, barber_id, service_type_id), computed by load() on a miss"""
+    return _lookup(_slots, key, load, SLOTS_TTL_SECONDS)
+
+
+def get_open_status(key: tuple, load):
+    """Cached shop status for a (date, "HH:MM") minute, computed by load() on a miss"""
+    with _lock:
+        # Only the current minute is ever asked for; drop earlier ones
+        if key not in _status:
+            _status.clear()
+    return _lookup(_status, key, load, STATUS_TTL_SECONDS)
+
+
+def get_birthdays(day, load):
+    """Cached list of customers whose birthday is `day`, computed by load() on a miss"""
+    with _lock:
+        # Only today is ever asked for; drop earlier days
+        if day not in _birthdays:
+            _birthdays.clear()
+    return _lookup(_birthdays, day, load, BIRTHDAYS_TTL_SECONDS)
+
+
+def invalidate_services():
+    """Slot lists depend on service durations, so they go too"""
+    global _generation
+    with _lock:
+        _services.clear()
+        _slots.clear()
+        _generation += 1
+
+
+def invalidate_barbers():
+    global _generation
+    with _lock:
+        _barbers.clear()
+        _generation += 1
+
+
+def invalidate_hours():
+    global _generation
+    with _lock:
+        _hours.clear()
+        _status.clear()
+        _generation += 1
+
+
+def invalidate_slots():
+    global _generation
+    with _lock:
+        _slots.clear()
+        _generation += 1
+
+
+def invalidate_holidays():
+    """Holidays only feed the open/closed status"""
+    global _generation
+    with _lock:
+        _status.clear()
+        _generation += 1
+
+
+def invalidate_birthdays():
+    global _generation
+    with _lock:
+        _birthdays.clear()
+        _generation += 1
@@ -1,20 +1,172 @@
-from sqlalchemy import create_engine
+import hashlib
+import logging
+import os
+import warnings
+
+from sqlalchemy import Column, MetaData, String, Table, bindparam, create_engine, event, inspect, select, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import SAWarning
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import NullPool, StaticPool
+from sqlalchemy.schema import CreateIndex
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./barbershop.db"
+logger = logging.getLogger(__name__)
+
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./barbershop.db")
+
+_url = make_url(SQLALCHEMY_DATABASE_URL)
+engine_options = {
+    "insertmanyvalues_page_size": 1000,
+    # Room for every router's compiled statements (default 500) so none get evicted
+    "query_cache_size": 1200,
+    # Sized for concurrent POS terminals; pre-ping drops stale connections
+    "pool_size": 20,
+    "max_overflow": 10,
+    "pool_timeout": 30,
+    "pool_recycle": 3600,
+    "pool_pre_ping": True,
+}
+QUEUE_POOL_OPTIONS = ("pool_size", "max_overflow", "pool_timeout", "pool_recycle")
+if os.getenv("DATABASE_POOL") == "null":
+    # Behind PgBouncer (transaction mode) the bouncer does the pooling; open per checkout
+    for option in QUEUE_POOL_OPTIONS:
+        engine_options.pop(option)
+    engine_options["poolclass"] = NullPool
+elif _url.get_backend_name() == "sqlite" and (
+    _url.database in (None, "", ":memory:") or _url.query.get("mode") == "memory"
+):
+    # The sizing options only apply to QueuePool; one shared connection keeps a single
+    # in-memory database visible to every request thread
+    for option in QUEUE_POOL_OPTIONS:
+        engine_options.pop(option)
+    engine_options["poolclass"] = StaticPool
+if _url.get_backend_name() == "sqlite":
+    engine_options["connect_args"] = {"check_same_thread": False}
+elif _url.get_driver_name() == "psycopg2":
+    # Send executemany() as multi-row VALUES pages instead of one INSERT per row
+    engine_options["executemany_mode"] = "values_plus_batch"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, **engine_options)
+
+if _url.get_backend_name() == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers run alongside a writer; NORMAL syncs at checkpoints, not every commit
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        # ~20 MB page cache per connection; sorts and temp tables stay off disk
+        cursor.execute("PRAGMA cache_size=-20000")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+# Objects keep their committed values: responses built after commit() don't re-SELECT
+# every row they touch. Endpoints that return an ORM instance, or read timestamps
+# or relationships written by the database, still db.refresh() it after commit
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
 
+# Records a fingerprint of the declared schema so startup can skip create_all
+_meta = MetaData()
+schema_meta = Table(
+    "schema_meta",
+    _meta,
+    Column("key", String(50), primary_key=True),
+    Column("value", String(64), nullable=False),
+)
+
+
+def schema_fingerprint() -> str:
+    """Hash of every table, column and index declared on Base.metadata"""
+    parts = []
+    for table in Base.metadata.sorted_tables:
+        parts.append(table.name)
+        parts.extend(f"{c.name}:{c.type!r}" for c in table.columns)
+        parts.extend(sorted(i.name for i in table.indexes))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+# Partial unique indexes added over tables whose old check-then-insert was racy.
+# Rows that would violate them are resolved first, or CREATE UNIQUE INDEX fails:
+# (index, select the losing rows, fix them)
+UNIQUE_INDEX_CONFLICTS = (
+    (
+        # The earliest active booking keeps the slot; later duplicates are cancelled
+        "uq_appointments_barber_slot",
+        text(
+            "SELECT a.id FROM appointments a WHERE a.status IN ('scheduled', 'confirmed') "
+            "AND EXISTS (SELECT 1 FROM appointments b WHERE b.barber_id = a.barber_id "
+            "AND b.scheduled_time = a.scheduled_time "
+            "AND b.status IN ('scheduled', 'confirmed') AND b.id < a.id)"
+        ),
+        text("UPDATE appointments SET status = 'cancelled' WHERE id IN :ids").bindparams(
+            bindparam("ids", expanding=True)
+        ),
+    ),
+    (
+        # The newest open break stays open; older ones end when it started
+        "uq_barber_breaks_open",
+        text(
+            "SELECT a.id FROM barber_breaks a WHERE a.end_time IS NULL "
+            "AND EXISTS (SELECT 1 FROM barber_breaks b WHERE b.barber_id = a.barber_id "
+            "AND b.end_time IS NULL AND b.id > a.id)"
+        ),
+        text(
+            "UPDATE barber_breaks SET end_time = (SELECT MAX(b.start_time) FROM barber_breaks b "
+            "WHERE b.barber_id = barber_breaks.barber_id AND b.end_time IS NULL) WHERE id IN :ids"
+        ).bindparams(bindparam("ids", expanding=True)),
+    ),
+)
+
+
+def resolve_unique_conflicts(conn):
+    """Fix rows that would block the partial unique indexes, logging what changed"""
+    for index_name, find, fix in UNIQUE_INDEX_CONFLICTS:
+        ids = conn.execute(find).scalars().all()
+        if ids:
+            logger.warning("Resolving %d row(s) that conflict with %s: ids %s", len(ids), index_name, ids)
+            conn.execute(fix, {"ids": ids})
+
+
+def init_db():
+    """Create missing tables and indexes, but only when the models have changed"""
+    fingerprint = schema_fingerprint()
+    with engine.begin() as conn:
+        if inspect(conn).has_table("schema_meta"):
+            current = conn.execute(
+                select(schema_meta.c.value).where(schema_meta.c.key == "schema_version")
+            ).scalar()
+            if current == fingerprint:
+                return False
+        else:
+            _meta.create_all(conn)
+
+        if conn.dialect.name == "postgresql":
+            conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        Base.metadata.create_all(conn)
+        resolve_unique_conflicts(conn)
+        # create_all skips indexes on tables that already exist
+        with warnings.catch_warnings():
+            # Expression indexes aren't reflected on SQLite, so checkfirst can't see them
+            warnings.filterwarnings("ignore", "Skipped unsupported reflection", SAWarning)
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    if all(isinstance(expr, Column) for expr in index.expressions):
+                        index.create(conn, checkfirst=True)
+                    else:
+                        conn.execute(CreateIndex(index, if_not_exists=True))
+
+        conn.execute(schema_meta.delete().where(schema_meta.c.key == "schema_version"))
+        conn.execute(schema_meta.insert().values(key="schema_version", value=fingerprint))
+    return True
+
+
 def get_db():
-    db = SessionLocal()
-    try:
+    # Plain per-request session: FastAPI may run setup and teardown on different
+    # worker threads, so a thread-local scoped_session is not safe here
+    with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
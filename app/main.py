@@ -1,9 +1,15 @@
+import os
+
+import anyio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from sqlalchemy import insert, select, text
 
-from app.database import engine, Base, SessionLocal
-from app.models import ServiceType, Barber
+from app.database import SessionLocal, init_db
+from app.responses import static_response
+from app.models import ServiceType, Barber, BarberSpecialty, Customer, CustomerTag
 from app.routers import (
     customers,
     barbers,
@@ -61,43 +67,118 @@ SEED_SERVICES = [
 ]
 
 SEED_BARBERS = [
-    {"name": "Mike", "commission_rate": 0.50, "specialties": "fades,beard design"},
-    {"name": "Carlos", "commission_rate": 0.50, "specialties": "fades,hair design"},
-    {"name": "James", "commission_rate": 0.45, "specialties": "classic cuts,hot shave"},
-    {"name": "Tony", "commission_rate": 0.50, "specialties": "all styles"},
+    {"name": "Mike", "commission_rate": 0.50, "specialties": ["fades", "beard design"]},
+    {"name": "Carlos", "commission_rate": 0.50, "specialties": ["fades", "hair design"]},
+    {"name": "James", "commission_rate": 0.45, "specialties": ["classic cuts", "hot shave"]},
+    {"name": "Tony", "commission_rate": 0.50, "specialties": ["all styles"]},
 ]
 
+# Built once at import. Services go out as one multi-row VALUES statement;
+# barbers stay an executemany so RETURNING hands back ids in seed order
+INSERT_SERVICES = insert(ServiceType).values(SEED_SERVICES)
+INSERT_BARBERS = insert(Barber).returning(Barber.id, sort_by_parameter_order=True)
+SEED_BARBER_ROWS = [{**b, "specialties": ",".join(b["specialties"])} for b in SEED_BARBERS]
+INSERT_BARBER_SPECIALTIES = insert(BarberSpecialty)
+INSERT_CUSTOMER_TAGS = insert(CustomerTag)
+
+
+# Sync endpoints and the get_db dependency run on AnyIO worker threads (40 by default).
+# Routes stay sync on the shared Session/engine; size this pool for concurrency
+# rather than moving individual routers to an async engine
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "100"))
+
+# Arbitrary key for the Postgres advisory lock that serialises seeding
+SEED_LOCK_ID = 742342
+
+
+def lock_for_seeding(db):
+    """Block other workers from seeding until the current transaction ends"""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        db.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": SEED_LOCK_ID})
+    elif dialect == "sqlite":
+        db.execute(text("BEGIN IMMEDIATE"))
+
 
 def seed_database():
-    db = SessionLocal()
-    try:
-        # Seed services if empty
-        if db.query(ServiceType).count() == 0:
-            for service_data in SEED_SERVICES:
-                service = ServiceType(**service_data)
-                db.add(service)
-            db.commit()
+    with SessionLocal() as db:
+        # Restarts against a populated database skip the write lock entirely
+        if all(db.query(db.query(ServiceType).exists(), db.query(Barber).exists()).one()):
+            return
+
+        # Both catalogs are seeded in one locked transaction with a single commit
+        lock_for_seeding(db)
+        if not db.query(db.query(ServiceType).exists()).scalar():
+            db.execute(INSERT_SERVICES)
             print(f"Seeded {len(SEED_SERVICES)} service types")
-        
-        # Seed barbers if empty
-        if db.query(Barber).count() == 0:
-            for barber_data in SEED_BARBERS:
-                barber = Barber(**barber_data)
-                db.add(barber)
-            db.commit()
+
+        if not db.query(db.query(Barber).exists()).scalar():
+            barber_ids = db.execute(INSERT_BARBERS, SEED_BARBER_ROWS).scalars().all()
+            db.execute(INSERT_BARBER_SPECIALTIES, [
+                {"barber_id": barber_id, "specialty": specialty}
+                for barber_id, b in zip(barber_ids, SEED_BARBERS)
+                for specialty in b["specialties"]
+            ])
             print(f"Seeded {len(SEED_BARBERS)} barbers")
-    finally:
-        db.close()
+        db.commit()
+
+
+def split_names(csv: str) -> list:
+    """Distinct lowercased entries of a comma-separated column"""
+    return list(dict.fromkeys(n.strip().lower() for n in csv.split(",") if n.strip()))
+
+
+def backfill_customer_tags():
+    """Create customer_tags rows for tags stored before the table existed"""
+    with SessionLocal() as db:
+        untagged = db.execute(
+            select(Customer.id, Customer.tags).where(
+                Customer.tags.isnot(None),
+                ~select(CustomerTag.customer_id).where(CustomerTag.customer_id == Customer.id).exists()
+            )
+        ).all()
+        rows = [
+            {"customer_id": customer_id, "tag": tag}
+            for customer_id, tags in untagged
+            for tag in split_names(tags)
+        ]
+        if rows:
+            db.execute(INSERT_CUSTOMER_TAGS, rows)
+            db.commit()
+
+
+def backfill_barber_specialties():
+    """Create barber_specialties rows for specialties stored before the table existed"""
+    with SessionLocal() as db:
+        missing = db.execute(
+            select(Barber.id, Barber.specialties).where(
+                Barber.specialties.isnot(None),
+                ~select(BarberSpecialty.barber_id).where(BarberSpecialty.barber_id == Barber.id).exists()
+            )
+        ).all()
+        rows = [
+            {"barber_id": barber_id, "specialty": specialty}
+            for barber_id, specialties in missing
+            for specialty in split_names(specialties)
+        ]
+        if rows:
+            db.execute(INSERT_BARBER_SPECIALTIES, rows)
+            db.commit()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: create tables and seed data
-    Base.metadata.create_all(bind=engine)
+    # Startup: size the worker threadpool, create tables, seed data and restore the cash drawer
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    if init_db():
+        # Only a schema change can leave tags or specialties without their index rows
+        backfill_customer_tags()
+        backfill_barber_specialties()
     seed_database()
+    app.state.drawer_log = cash_drawer.open_drawer_log()
     yield
-    # Shutdown
-    pass
+    # Shutdown: fsync and release the drawer journal
+    app.state.drawer_log.close()
 
 
 app = FastAPI(
@@ -105,15 +186,29 @@ app = FastAPI(
     description="Point of Sale system for barbershops - Walk-ins, Appointments, Queue Management",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
+
+# CORS: the Vite frontend on port 3004, opened via localhost or the shop's LAN address
+CORS_ORIGINS = [
+    origin.strip()
+    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3004,http://127.0.0.1:3004").split(",")
+    if origin.strip()
+]
+# Credentials are allowed, so the default only matches loopback and private-LAN (RFC 1918) hosts
+CORS_ORIGIN_REGEX = os.getenv(
+    "CORS_ORIGIN_REGEX",
+    r"http://(localhost|127\.0\.0\.1|10(\.\d{1,3}){3}|192\.168(\.\d{1,3}){2}"
+    r"|172\.(1[6-9]|2\d|3[01])(\.\d{1,3}){2}):3004",
 )
 
-# CORS
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=CORS_ORIGINS,
+    allow_origin_regex=CORS_ORIGIN_REGEX or None,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "PATCH", "DELETE"],
+    allow_headers=["Content-Type"],
 )
 
 # Register routers
@@ -141,15 +236,20 @@ app.include_router(quick.router)
 app.include_router(dashboard.router)
 
 
+# Polled constantly by load balancers, so no DB access
+HEALTH_RESPONSE = static_response({"status": "healthy"}, headers={"Cache-Control": "max-age=5"})
+ROOT_RESPONSE = static_response({
+    "name": "Barbershop POS",
+    "version": "1.0.0",
+    "docs": "/docs"
+})
+
+
 @app.get("/health")
-def health_check():
-    return {"status": "healthy"}
+async def health_check():
+    return HEALTH_RESPONSE
 
 
 @app.get("/")
-def root():
-    return {
-        "name": "Barbershop POS",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+async def root():
+    return ROOT_RESPONSE
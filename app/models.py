@@ -1,27 +1,123 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Text, Enum as SQLEnum
+from sqlalchemy import extract, func, text, Column, Integer, String, Float, Numeric, Boolean, DateTime, ForeignKey, Text, Index
 from sqlalchemy.orm import relationship
+from sqlalchemy.types import TypeDecorator
 from datetime import datetime
 import enum
 
 from app.database import Base
 
+class Money(TypeDecorator):
+    """Currency column: exact DECIMAL(10,2) in the database, plain float in Python"""
+    impl = Numeric(10, 2, asdecimal=False)
+    cache_ok = True
 
-class OrderStatus(str, enum.Enum):
+    def process_result_value(self, value, dialect):
+        # SQLite's NUMERIC affinity hands back whole amounts as int
+        return float(value) if value is not None else None
+
+
+class StrValueEnum(str, enum.Enum):
+    """String enum that formats as its value, e.g. in f-strings"""
+
+    def __str__(self):
+        return self.value
+
+
+class ValueEnum(TypeDecorator):
+    """Plain string column holding enum values ("in_progress").
+
+    Known values read back as enum members; anything else (legacy free-form rows
+    such as a "Paid" status) reads back as the raw string instead of failing.
+    Input is validated at the Pydantic boundary, not by the column.
+    """
+    impl = String
+    cache_ok = True
+
+    def __init__(self, enum_cls, length=None):
+        super().__init__(length)
+        self.enum_cls = enum_cls
+
+    def process_bind_param(self, value, dialect):
+        return value.value if isinstance(value, enum.Enum) else value
+
+    def process_result_value(self, value, dialect):
+        try:
+            return self.enum_cls(value)
+        except ValueError:
+            return value
+
+
+def value_enum(enum_cls):
+    """Status column type storing member values, matching existing rows"""
+    return ValueEnum(enum_cls)
+
+
+class OrderStatus(StrValueEnum):
     WAITING = "waiting"
     IN_PROGRESS = "in_progress"
     COMPLETED = "completed"
     CANCELLED = "cancelled"
 
 
-class PaymentMethod(str, enum.Enum):
+class PaymentMethod(StrValueEnum):
     CASH = "cash"
     CARD = "card"
     APPLE_PAY = "apple_pay"
+    GOOGLE_PAY = "google_pay"
+    VENMO = "venmo"
+    GIFT_CARD = "gift_card"
     OTHER = "other"
 
 
+class AppointmentStatus(StrValueEnum):
+    SCHEDULED = "scheduled"
+    CONFIRMED = "confirmed"
+    CHECKED_IN = "checked_in"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    NO_SHOW = "no_show"
+
+
+class QueueStatus(StrValueEnum):
+    WAITING = "waiting"
+    CALLED = "called"
+    IN_SERVICE = "in_service"
+    COMPLETED = "completed"
+    LEFT = "left"
+
+
+class FeedbackStatus(StrValueEnum):
+    PENDING = "pending"
+    REVIEWING = "reviewing"
+    PLANNED = "planned"
+    IN_PROGRESS = "in_progress"
+    COMPLETED = "completed"
+    WONT_FIX = "wont_fix"
+
+
+# Timestamp columns carry both defaults: the ORM stamps rows it inserts, and the
+# database stamps rows written by Core/raw SQL. Existing SQLite tables cannot gain
+# a column DEFAULT without a rebuild, so the Python default stays authoritative.
+# DateTime columns are naive: scheduled/business times are shop-local wall clock
+# and are compared with datetime.now() in the routers, so "today" is computed in
+# Python rather than with CURRENT_DATE (which SQLite evaluates in UTC).
+
+
 class Customer(Base):
     __tablename__ = "customers"
+    __table_args__ = (
+        # Trigram indexes serve the substring LIKE/ILIKE in /customers/search
+        # (PostgreSQL only; pg_trgm is enabled by init_db)
+        Index(
+            "ix_customers_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_customers_phone_trgm", "phone",
+            postgresql_using="gin", postgresql_ops={"phone": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
@@ -35,19 +131,38 @@ class Customer(Base):
     birthday = Column(DateTime, nullable=True)  # Customer birthday for rewards
     birthday_discount_used_year = Column(Integer, nullable=True)  # Year discount was used
     vip_tier = Column(String(20), default="bronze")  # bronze, silver, gold, platinum
-    total_spent = Column(Float, default=0.0)  # Total amount spent for tier calculation
+    total_spent = Column(Money, default=0.0)  # Total amount spent for tier calculation
     visit_count = Column(Integer, default=0)  # Number of visits
     tags = Column(String(500), nullable=True)  # Comma-separated tags: "prefers-quiet,cash-only,senior"
     communication_preference = Column(String(20), default="any")  # sms, email, any, none
     current_streak = Column(Integer, default=0)  # Consecutive visit streak
     longest_streak = Column(Integer, default=0)  # Best streak ever
     last_visit_date = Column(DateTime, nullable=True)  # For streak calculation
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     
     orders = relationship("Order", back_populates="customer")
     preferred_barber = relationship("Barber", foreign_keys=[preferred_barber_id])
 
 
+class CustomerTag(Base):
+    """One row per customer per tag, so filtering by tag is an exact, indexed match"""
+    __tablename__ = "customer_tags"
+    __table_args__ = (
+        Index("ix_customer_tags_tag_customer", "tag", "customer_id"),
+    )
+
+    customer_id = Column(Integer, ForeignKey("customers.id"), primary_key=True)
+    tag = Column(String, primary_key=True)
+
+
+# Birthday lookups filter on month/day; an expression index needs the mapped column
+Index(
+    "ix_customers_birthday_md",
+    extract("month", Customer.birthday),
+    extract("day", Customer.birthday),
+)
+
+
 class Barber(Base):
     __tablename__ = "barbers"
 
@@ -59,10 +174,30 @@ class Barber(Base):
     specialties = Column(String, nullable=True)
     is_active = Column(Boolean, default=True)
     is_available = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     orders = relationship("Order", back_populates="barber")
     timeclock_entries = relationship("TimeClock", back_populates="barber")
+    specialty_links = relationship("BarberSpecialty", cascade="all, delete-orphan")
+
+    def set_specialties(self, specialties):
+        """Keep the display string and the indexed specialty rows in sync"""
+        self.specialties = specialties
+        names = dict.fromkeys(
+            s.strip().lower() for s in (specialties or "").split(",") if s.strip()
+        )
+        self.specialty_links = [BarberSpecialty(specialty=name) for name in names]
+
+
+class BarberSpecialty(Base):
+    """One row per barber per specialty, so filtering by specialty can use an index"""
+    __tablename__ = "barber_specialties"
+    __table_args__ = (
+        Index("ix_barber_specialties_specialty_barber", "specialty", "barber_id"),
+    )
+
+    barber_id = Column(Integer, ForeignKey("barbers.id"), primary_key=True)
+    specialty = Column(String, primary_key=True)
 
 
 class ServiceType(Base):
@@ -71,9 +206,9 @@ class ServiceType(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, index=True)
     category = Column(String, index=True)  # haircut, beard, combo, addon
-    base_price = Column(Float)
-    peak_price = Column(Float, nullable=True)  # Weekend/evening price
-    off_peak_price = Column(Float, nullable=True)  # Discounted early/weekday price
+    base_price = Column(Money)
+    peak_price = Column(Money, nullable=True)  # Weekend/evening price
+    off_peak_price = Column(Money, nullable=True)  # Discounted early/weekday price
     duration_minutes = Column(Integer, default=30)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
@@ -83,18 +218,30 @@ class ServiceType(Base):
 
 class Order(Base):
     __tablename__ = "orders"
+    __table_args__ = (
+        Index("ix_orders_status_created", "status", "created_at"),
+        Index("ix_orders_status_completed", "status", "completed_at"),
+        Index("ix_orders_barber_status", "barber_id", "status"),
+        # Customer history: equality on both leading columns, newest-first by backward scan;
+        # on PostgreSQL the included columns let the stats sums skip the heap
+        Index(
+            "ix_orders_customer_status_completed",
+            "customer_id", "status", "completed_at",
+            postgresql_include=["total", "tip", "barber_id"],
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
     barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=True)
-    status = Column(String, default=OrderStatus.WAITING)
+    status = Column(value_enum(OrderStatus), default=OrderStatus.WAITING)
     queue_position = Column(Integer, nullable=True)
-    subtotal = Column(Float, default=0.0)
-    tax = Column(Float, default=0.0)
-    tip = Column(Float, default=0.0)
-    total = Column(Float, default=0.0)
+    subtotal = Column(Money, default=0.0)
+    tax = Column(Money, default=0.0)
+    tip = Column(Money, default=0.0)
+    total = Column(Money, default=0.0)
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     started_at = Column(DateTime, nullable=True)
     completed_at = Column(DateTime, nullable=True)
 
@@ -111,7 +258,7 @@ class OrderService(Base):
     order_id = Column(Integer, ForeignKey("orders.id"))
     service_type_id = Column(Integer, ForeignKey("service_types.id"))
     quantity = Column(Integer, default=1)
-    unit_price = Column(Float)
+    unit_price = Column(Money)
     notes = Column(Text, nullable=True)
 
     order = relationship("Order", back_populates="services")
@@ -129,7 +276,7 @@ class CustomerServiceNote(Base):
     note_type = Column(String(50), default="preference")  # preference, warning, style, allergy
     is_important = Column(Boolean, default=False)
     created_by = Column(String(100), nullable=True)  # Barber name
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     customer = relationship("Customer")
     service_type = relationship("ServiceType")
@@ -155,7 +302,7 @@ class Holiday(Base):
     name = Column(String(100), nullable=False)
     is_closed = Column(Boolean, default=True)
     modified_hours = Column(String(50), nullable=True)  # "10:00-14:00" for special hours
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
 
 class Payment(Base):
@@ -163,16 +310,19 @@ class Payment(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"))
-    amount = Column(Float)
-    tip_amount = Column(Float, default=0.0)
-    method = Column(String, default=PaymentMethod.CASH)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    amount = Column(Money)
+    tip_amount = Column(Money, default=0.0)
+    method = Column(value_enum(PaymentMethod), default=PaymentMethod.CASH)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     order = relationship("Order", back_populates="payment")
 
 
 class WalkInQueue(Base):
     __tablename__ = "walkin_queue"
+    __table_args__ = (
+        Index("ix_walkin_queue_status_position", "status", "position"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_name = Column(String)
@@ -181,9 +331,9 @@ class WalkInQueue(Base):
     requested_barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=True)
     service_notes = Column(Text, nullable=True)
     position = Column(Integer)
-    status = Column(String, default="waiting")  # waiting, called, in_service, completed, left
+    status = Column(value_enum(QueueStatus), default=QueueStatus.WAITING)
     estimated_wait = Column(Integer, nullable=True)  # minutes
-    check_in_time = Column(DateTime, default=datetime.utcnow)
+    check_in_time = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     called_time = Column(DateTime, nullable=True)
     completed_time = Column(DateTime, nullable=True)
 
@@ -193,10 +343,18 @@ class WalkInQueue(Base):
 
 class TimeClock(Base):
     __tablename__ = "timeclock"
+    __table_args__ = (
+        # Open shifts only; clock-in/out and availability look these up per barber
+        Index(
+            "ix_timeclock_open", "barber_id", "clock_in",
+            sqlite_where=text("clock_out IS NULL"),
+            postgresql_where=text("clock_out IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     barber_id = Column(Integer, ForeignKey("barbers.id"))
-    clock_in = Column(DateTime, default=datetime.utcnow)
+    clock_in = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     clock_out = Column(DateTime, nullable=True)
     
     barber = relationship("Barber", back_populates="timeclock_entries")
@@ -204,6 +362,17 @@ class TimeClock(Base):
 
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        Index("ix_appointments_barber_time", "barber_id", "scheduled_time"),
+        Index("ix_appointments_time_barber_status", "scheduled_time", "barber_id", "status"),
+        # A barber holds at most one active booking per start time
+        Index(
+            "uq_appointments_barber_slot", "barber_id", "scheduled_time",
+            unique=True,
+            sqlite_where=text("status IN ('scheduled', 'confirmed')"),
+            postgresql_where=text("status IN ('scheduled', 'confirmed')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
@@ -213,10 +382,12 @@ class Appointment(Base):
     service_type_id = Column(Integer, ForeignKey("service_types.id"))
     scheduled_time = Column(DateTime)
     duration_minutes = Column(Integer, default=30)
-    status = Column(String, default="scheduled")  # scheduled, confirmed, in_progress, completed, cancelled, no_show
+    # scheduled_time is covered by ix_appointments_time_barber_status; status alone
+    # is filtered without a date range (status lists, recurring cleanup)
+    status = Column(value_enum(AppointmentStatus), default=AppointmentStatus.SCHEDULED, index=True)
     notes = Column(Text, nullable=True)
     recurring_id = Column(Integer, ForeignKey("recurring_appointments.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     customer = relationship("Customer")
     barber = relationship("Barber")
@@ -238,7 +409,7 @@ class RecurringAppointment(Base):
     start_date = Column(DateTime, nullable=False)
     end_date = Column(DateTime, nullable=True)  # null = indefinite
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     customer = relationship("Customer")
     barber = relationship("Barber")
@@ -256,8 +427,8 @@ class Feedback(Base):
     email = Column(String(255), nullable=True)
     page_url = Column(String(500), nullable=True)
     user_agent = Column(String(500), nullable=True)
-    status = Column(String(50), default="pending")  # pending, reviewing, planned, in_progress, completed, wont_fix
-    created_at = Column(DateTime, default=datetime.utcnow)
+    status = Column(value_enum(FeedbackStatus), default=FeedbackStatus.PENDING)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
 
 class LoyaltyTransaction(Base):
@@ -270,7 +441,7 @@ class LoyaltyTransaction(Base):
     points = Column(Integer, nullable=False)  # positive = earned, negative = redeemed
     transaction_type = Column(String(50), nullable=False)  # earned, redeemed, bonus, adjustment
     description = Column(String(255), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     customer = relationship("Customer")
     order = relationship("Order")
@@ -282,15 +453,15 @@ class GiftCard(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     code = Column(String(20), unique=True, index=True, nullable=False)
-    initial_balance = Column(Float, nullable=False)
-    current_balance = Column(Float, nullable=False)
+    initial_balance = Column(Money, nullable=False)
+    current_balance = Column(Money, nullable=False)
     purchaser_name = Column(String(100), nullable=True)
     purchaser_email = Column(String(255), nullable=True)
     recipient_name = Column(String(100), nullable=True)
     recipient_email = Column(String(255), nullable=True)
     message = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     expires_at = Column(DateTime, nullable=True)
 
 
@@ -300,11 +471,11 @@ class GiftCardTransaction(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     gift_card_id = Column(Integer, ForeignKey("gift_cards.id"), nullable=False)
-    amount = Column(Float, nullable=False)  # positive = add, negative = redemption
+    amount = Column(Money, nullable=False)  # positive = add, negative = redemption
     transaction_type = Column(String(50), nullable=False)  # purchase, redemption, reload
     description = Column(String(255), nullable=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     gift_card = relationship("GiftCard")
 
@@ -316,11 +487,11 @@ class ServicePackage(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    price = Column(Float, nullable=False)
+    price = Column(Money, nullable=False)
     valid_days = Column(Integer, default=365)
     max_uses = Column(Integer, default=1)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     services = relationship("PackageService", back_populates="package")
 
@@ -346,8 +517,8 @@ class CustomerPackage(Base):
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     package_id = Column(Integer, ForeignKey("service_packages.id"), nullable=False)
     remaining_uses = Column(Integer, nullable=False)
-    purchase_price = Column(Float, nullable=False)
-    purchased_at = Column(DateTime, default=datetime.utcnow)
+    purchase_price = Column(Money, nullable=False)
+    purchased_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     expires_at = Column(DateTime, nullable=True)
 
     customer = relationship("Customer")
@@ -364,8 +535,8 @@ class Discount(Base):
     description = Column(Text, nullable=True)
     discount_type = Column(String(20), nullable=False)  # "percent" or "fixed"
     discount_value = Column(Float, nullable=False)
-    min_purchase = Column(Float, default=0.0)
-    max_discount = Column(Float, nullable=True)  # cap for percentage discounts
+    min_purchase = Column(Money, default=0.0)
+    max_discount = Column(Money, nullable=True)  # cap for percentage discounts
     max_uses = Column(Integer, nullable=True)  # total uses allowed
     max_uses_per_customer = Column(Integer, default=1)
     times_used = Column(Integer, default=0)
@@ -374,7 +545,7 @@ class Discount(Base):
     first_visit_only = Column(Boolean, default=False)
     service_ids = Column(String, nullable=True)  # comma-separated service IDs
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
 
 class DiscountUsage(Base):
@@ -385,8 +556,8 @@ class DiscountUsage(Base):
     discount_id = Column(Integer, ForeignKey("discounts.id"), nullable=False)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=True)
-    amount_saved = Column(Float, nullable=False)
-    used_at = Column(DateTime, default=datetime.utcnow)
+    amount_saved = Column(Money, nullable=False)
+    used_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     discount = relationship("Discount")
     customer = relationship("Customer")
@@ -421,11 +592,20 @@ class BarberDayOff(Base):
 class BarberBreak(Base):
     """Track barber breaks during the day"""
     __tablename__ = "barber_breaks"
+    __table_args__ = (
+        # A barber has at most one break in progress
+        Index(
+            "uq_barber_breaks_open", "barber_id",
+            unique=True,
+            sqlite_where=text("end_time IS NULL"),
+            postgresql_where=text("end_time IS NULL"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=False)
     break_type = Column(String(50), nullable=False)  # lunch, short, personal
-    start_time = Column(DateTime, default=datetime.utcnow)
+    start_time = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     end_time = Column(DateTime, nullable=True)
     scheduled_end_time = Column(DateTime, nullable=True)  # When break should end
     notes = Column(String(255), nullable=True)
@@ -440,13 +620,13 @@ class MembershipPlan(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(100), nullable=False)
     description = Column(Text, nullable=True)
-    monthly_price = Column(Float, nullable=False)
+    monthly_price = Column(Money, nullable=False)
     haircuts_included = Column(Integer, default=0)  # 0 = unlimited
     discount_percent = Column(Integer, default=0)  # Discount on additional services
     priority_booking = Column(Boolean, default=False)
     free_products_monthly = Column(Integer, default=0)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
 
 class CustomerMembership(Base):
@@ -457,7 +637,7 @@ class CustomerMembership(Base):
     customer_id = Column(Integer, ForeignKey("customers.id"), nullable=False)
     plan_id = Column(Integer, ForeignKey("membership_plans.id"), nullable=False)
     status = Column(String(20), default="active")  # active, paused, cancelled, expired
-    start_date = Column(DateTime, default=datetime.utcnow)
+    start_date = Column(DateTime, default=datetime.utcnow, server_default=func.now())
     next_billing_date = Column(DateTime, nullable=True)
     cancelled_at = Column(DateTime, nullable=True)
     haircuts_used_this_month = Column(Integer, default=0)
@@ -483,7 +663,7 @@ class Referral(Base):
     referred_reward_type = Column(String(20), default="discount")
     referred_reward_value = Column(Float, default=10.0)
     rewarded_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     referrer = relationship("Customer", foreign_keys=[referrer_id])
     referred = relationship("Customer", foreign_keys=[referred_id])
@@ -496,11 +676,11 @@ class RevenueTarget(Base):
     id = Column(Integer, primary_key=True, index=True)
     target_type = Column(String(20), nullable=False)  # daily, weekly, monthly
     target_date = Column(DateTime, nullable=False)  # The date/week/month this target is for
-    target_amount = Column(Float, nullable=False)
-    actual_amount = Column(Float, default=0.0)
+    target_amount = Column(Money, nullable=False)
+    actual_amount = Column(Money, default=0.0)
     barber_id = Column(Integer, ForeignKey("barbers.id"), nullable=True)  # null = shop-wide
     notes = Column(Text, nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     barber = relationship("Barber")
 
@@ -514,13 +694,13 @@ class Product(Base):
     category = Column(String(50), nullable=True)  # pomade, shampoo, beard oil, etc.
     sku = Column(String(50), unique=True, nullable=True)
     barcode = Column(String(50), nullable=True)
-    price = Column(Float, nullable=False)
-    cost = Column(Float, default=0.0)  # Cost to shop for profit tracking
+    price = Column(Money, nullable=False)
+    cost = Column(Money, default=0.0)  # Cost to shop for profit tracking
     stock_quantity = Column(Integer, default=0)
     low_stock_threshold = Column(Integer, default=5)
     description = Column(Text, nullable=True)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
 
 class InventoryTransaction(Base):
@@ -533,6 +713,6 @@ class InventoryTransaction(Base):
     transaction_type = Column(String(50), nullable=False)  # restock, sale, adjustment, damaged, returned
     notes = Column(Text, nullable=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=True)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    created_at = Column(DateTime, default=datetime.utcnow, server_default=func.now())
 
     product = relationship("Product")
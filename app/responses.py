@@ -0,0 +1,10 @@
+from fastapi.responses import ORJSONResponse
+
+
+def static_response(content, **kwargs) -> ORJSONResponse:
+    """Response for a payload that never changes, encoded once at import.
+
+    Return it from an `async def` handler: the same bytes go out on every request,
+    with no per-request serialisation and no threadpool hop.
+    """
+    return ORJSONResponse(content, **kwargs)
@@ -1,15 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only, raiseload
+from sqlalchemy import func, insert, select, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
 
 from app.database import get_db
+from app.cache import get_service, get_slots, invalidate_slots
 from app.models import Appointment, Customer, Barber, ServiceType
 
 router = APIRouter(prefix="/appointments", tags=["appointments"])
 
+# Statuses that hold a barber's time when computing free slots
+ACTIVE_STATUSES = ("scheduled", "confirmed", "in_progress")
+# Bookings that have not started yet (also the scope of uq_appointments_barber_slot)
+BOOKED_STATUSES = ("scheduled", "confirmed")
+# Statuses PATCH /status accepts, in the order the error message lists them
+VALID_STATUSES = ("scheduled", "confirmed", "in_progress", "completed", "cancelled", "no_show")
+
+# Business hours: 9 AM to 7 PM, booked on a 30-minute grid
+OPEN_HOUR = 9
+CLOSE_HOUR = 19
+# (offset from midnight, "HH:MM" label) for every slot start, built once
+SLOT_GRID = tuple(
+    (timedelta(minutes=minute), f"{minute // 60:02d}:{minute % 60:02d}")
+    for minute in range(OPEN_HOUR * 60, CLOSE_HOUR * 60, 30)
+)
+
 
 class AppointmentCreate(BaseModel):
     customer_name: str
@@ -24,8 +42,8 @@ class AppointmentCreate(BaseModel):
 
 class AppointmentResponse(BaseModel):
     id: int
-    customer_name: str
-    customer_phone: str
+    customer_name: Optional[str]
+    customer_phone: Optional[str]
     customer_id: Optional[int]
     barber_id: Optional[int]
     barber_name: Optional[str] = None
@@ -41,55 +59,76 @@ class AppointmentResponse(BaseModel):
         from_attributes = True
 
 
-@router.get("/")
+# Flat list rows with barber/service names joined in; no ORM instances are built
+APPOINTMENT_ROWS = select(
+    Appointment.id,
+    Appointment.customer_name,
+    Appointment.customer_phone,
+    Appointment.customer_id,
+    Appointment.barber_id,
+    Barber.name.label("barber_name"),
+    Appointment.service_type_id,
+    func.coalesce(ServiceType.name, "Unknown").label("service_name"),
+    Appointment.scheduled_time,
+    Appointment.duration_minutes,
+    Appointment.status,
+    Appointment.notes,
+    Appointment.created_at,
+).outerjoin(Barber, Appointment.barber_id == Barber.id).outerjoin(
+    ServiceType, Appointment.service_type_id == ServiceType.id
+)
+
+
+@router.get("/", response_model=List[AppointmentResponse])
 def list_appointments(
     date: Optional[str] = None,
     barber_id: Optional[int] = None,
     status: Optional[str] = None,
     db: Session = Depends(get_db)
 ):
-    query = db.query(Appointment)
+    stmt = APPOINTMENT_ROWS
     
     if date:
-        target_date = datetime.strptime(date, "%Y-%m-%d").date()
-        query = query.filter(func.date(Appointment.scheduled_time) == target_date)
+        # Half-open range on the raw column so the scheduled_time index applies
+        day_start = datetime.strptime(date, "%Y-%m-%d")
+        stmt = stmt.where(
+            Appointment.scheduled_time >= day_start,
+            Appointment.scheduled_time < day_start + timedelta(days=1)
+        )
     
     if barber_id:
-        query = query.filter(Appointment.barber_id == barber_id)
+        stmt = stmt.where(Appointment.barber_id == barber_id)
     
     if status:
-        query = query.filter(Appointment.status == status)
+        stmt = stmt.where(Appointment.status == status)
     
-    appointments = query.order_by(Appointment.scheduled_time).all()
-    
-    result = []
-    for appt in appointments:
-        barber_name = None
-        if appt.barber_id:
-            barber = db.query(Barber).filter(Barber.id == appt.barber_id).first()
-            if barber:
-                barber_name = barber.name
+    return db.execute(stmt.order_by(Appointment.scheduled_time)).mappings().all()
+
+
+def iter_free_slots(day_start: datetime, duration: timedelta, booked):
+    """Yield open grid slots; booked yields (start, end) pairs in start order"""
+    day_close = day_start + timedelta(hours=CLOSE_HOUR)
+    pending = next(booked, None)
+    busy_until = None
+    
+    for offset, label in SLOT_GRID:
+        current_time = day_start + offset
+        slot_end = current_time + duration
+        if slot_end > day_close:
+            return
         
-        service = db.query(ServiceType).filter(ServiceType.id == appt.service_type_id).first()
-        service_name = service.name if service else "Unknown"
+        # Slot conflicts if any appointment starting before slot_end runs past current_time
+        while pending is not None and pending[0] < slot_end:
+            if busy_until is None or pending[1] > busy_until:
+                busy_until = pending[1]
+            pending = next(booked, None)
         
-        result.append({
-            "id": appt.id,
-            "customer_name": appt.customer_name,
-            "customer_phone": appt.customer_phone,
-            "customer_id": appt.customer_id,
-            "barber_id": appt.barber_id,
-            "barber_name": barber_name,
-            "service_type_id": appt.service_type_id,
-            "service_name": service_name,
-            "scheduled_time": appt.scheduled_time,
-            "duration_minutes": appt.duration_minutes,
-            "status": appt.status,
-            "notes": appt.notes,
-            "created_at": appt.created_at
-        })
-    
-    return result
+        if busy_until is None or busy_until <= current_time:
+            yield {
+                "time": label,
+                "datetime": current_time.isoformat(),
+                "available": True
+            }
 
 
 @router.get("/available-slots")
@@ -100,73 +139,52 @@ def get_available_slots(
     db: Session = Depends(get_db)
 ):
     """Get available time slots for a given date and service"""
-    target_date = datetime.strptime(date, "%Y-%m-%d").date()
-    
-    service = db.query(ServiceType).filter(ServiceType.id == service_type_id).first()
+    day_start = datetime.strptime(date, "%Y-%m-%d")
+    return get_slots(
+        (day_start.date(), barber_id, service_type_id),
+        lambda: compute_available_slots(db, day_start, service_type_id, barber_id),
+    )
+
+
+def compute_available_slots(db: Session, day_start: datetime, service_type_id: int, barber_id: Optional[int]):
+    """Free slots for the day, read straight from the database"""
+    service = get_service(db, service_type_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    duration = service.duration_minutes
-    
-    # Business hours: 9 AM to 7 PM
-    start_hour = 9
-    end_hour = 19
+    duration = timedelta(minutes=service.duration_minutes)
     
-    # Get existing appointments for the date
-    query = db.query(Appointment).filter(
-        func.date(Appointment.scheduled_time) == target_date,
-        Appointment.status.in_(["scheduled", "confirmed", "in_progress"])
+    # Get existing appointments for the date (only the columns the sweep needs)
+    stmt = select(Appointment.scheduled_time, Appointment.duration_minutes).where(
+        Appointment.scheduled_time >= day_start,
+        Appointment.scheduled_time < day_start + timedelta(days=1),
+        Appointment.status.in_(ACTIVE_STATUSES)
     )
     if barber_id:
-        query = query.filter(Appointment.barber_id == barber_id)
-    
-    existing = query.all()
-    
-    # Generate 30-minute slots
-    slots = []
-    current_time = datetime.combine(target_date, datetime.min.time().replace(hour=start_hour))
-    end_time = datetime.combine(target_date, datetime.min.time().replace(hour=end_hour))
-    
-    while current_time + timedelta(minutes=duration) <= end_time:
-        slot_end = current_time + timedelta(minutes=duration)
-        
-        # Check if slot conflicts with existing appointments
-        available = True
-        for appt in existing:
-            appt_end = appt.scheduled_time + timedelta(minutes=appt.duration_minutes)
-            if (current_time < appt_end and slot_end > appt.scheduled_time):
-                available = False
-                break
-        
-        if available:
-            slots.append({
-                "time": current_time.strftime("%H:%M"),
-                "datetime": current_time.isoformat(),
-                "available": True
-            })
-        
-        current_time += timedelta(minutes=30)
+        stmt = stmt.where(Appointment.barber_id == barber_id)
     
-    return slots
+    booked = (
+        (start, start + timedelta(minutes=duration_minutes))
+        for start, duration_minutes in db.execute(stmt.order_by(Appointment.scheduled_time))
+    )
+    return list(iter_free_slots(day_start, duration, booked))
+
+
+def bulk_create_appointments(db: Session, rows: List[dict]) -> List[int]:
+    """Insert many appointments in one executemany; returns ids in row order (caller commits)"""
+    if not rows:
+        return []
+    stmt = insert(Appointment).returning(Appointment.id, sort_by_parameter_order=True)
+    return db.execute(stmt, rows).scalars().all()
 
 
 @router.post("/")
 def create_appointment(appt: AppointmentCreate, db: Session = Depends(get_db)):
     # Validate service
-    service = db.query(ServiceType).filter(ServiceType.id == appt.service_type_id).first()
+    service = get_service(db, appt.service_type_id)
     if not service:
         raise HTTPException(status_code=404, detail="Service not found")
     
-    # Check for conflicts
-    existing = db.query(Appointment).filter(
-        Appointment.barber_id == appt.barber_id,
-        Appointment.scheduled_time == appt.scheduled_time,
-        Appointment.status.in_(["scheduled", "confirmed"])
-    ).first()
-    
-    if existing:
-        raise HTTPException(status_code=400, detail="Time slot not available")
-    
     appointment = Appointment(
         customer_name=appt.customer_name,
         customer_phone=appt.customer_phone,
@@ -178,8 +196,13 @@ def create_appointment(appt: AppointmentCreate, db: Session = Depends(get_db)):
         notes=appt.notes
     )
     db.add(appointment)
-    db.commit()
-    db.refresh(appointment)
+    # uq_appointments_barber_slot rejects a second active booking for the barber
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Time slot not available")
+    invalidate_slots()
     
     return {
         "id": appointment.id,
@@ -195,37 +218,48 @@ def update_appointment_status(
     status: str,
     db: Session = Depends(get_db)
 ):
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
-    if not appointment:
+    if status not in VALID_STATUSES:
+        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {list(VALID_STATUSES)}")
+    
+    try:
+        result = db.execute(
+            update(Appointment).where(Appointment.id == appointment_id).values(status=status)
+        )
+        db.commit()
+    except IntegrityError:
+        # Reactivating a slot the barber has since rebooked
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Time slot not available")
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Appointment not found")
+    invalidate_slots()
     
-    valid_statuses = ["scheduled", "confirmed", "in_progress", "completed", "cancelled", "no_show"]
-    if status not in valid_statuses:
-        raise HTTPException(status_code=400, detail=f"Invalid status. Must be one of: {valid_statuses}")
-    
-    appointment.status = status
-    db.commit()
-    
-    return {"message": "Status updated", "status": appointment.status}
+    return {"message": "Status updated", "status": status}
 
 
 @router.delete("/{appointment_id}")
 def cancel_appointment(appointment_id: int, db: Session = Depends(get_db)):
-    appointment = db.query(Appointment).filter(Appointment.id == appointment_id).first()
-    if not appointment:
-        raise HTTPException(status_code=404, detail="Appointment not found")
-    
-    appointment.status = "cancelled"
+    result = db.execute(
+        update(Appointment).where(Appointment.id == appointment_id).values(status="cancelled")
+    )
     db.commit()
+    if result.rowcount == 0:
+        raise HTTPException(status_code=404, detail="Appointment not found")
+    invalidate_slots()
     
     return {"message": "Appointment cancelled"}
 
 
-@router.get("/today")
+@router.get("/today", response_model=List[AppointmentResponse])
 def get_todays_appointments(db: Session = Depends(get_db)):
     """Get all appointments for today"""
-    today = date.today()
-    return list_appointments(date=today.isoformat(), db=db)
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    stmt = APPOINTMENT_ROWS.where(
+        Appointment.scheduled_time >= day_start,
+        Appointment.scheduled_time < day_start + timedelta(days=1)
+    ).order_by(Appointment.scheduled_time)
+    
+    return db.execute(stmt).mappings().all()
 
 
 @router.post("/{appointment_id}/confirm")
@@ -256,6 +290,7 @@ def check_in_appointment(appointment_id: int, db: Session = Depends(get_db)):
     
     appointment.status = "checked_in"
     db.commit()
+    invalidate_slots()
     
     return {"message": "Customer checked in", "status": "checked_in"}
 
@@ -272,6 +307,7 @@ def start_appointment(appointment_id: int, db: Session = Depends(get_db)):
     
     appointment.status = "in_progress"
     db.commit()
+    invalidate_slots()
     
     return {"message": "Service started", "status": "in_progress"}
 
@@ -288,6 +324,7 @@ def complete_appointment(appointment_id: int, db: Session = Depends(get_db)):
     
     appointment.status = "completed"
     db.commit()
+    invalidate_slots()
     
     return {"message": "Appointment completed", "status": "completed"}
 
@@ -301,6 +338,7 @@ def mark_no_show(appointment_id: int, db: Session = Depends(get_db)):
     
     appointment.status = "no_show"
     db.commit()
+    invalidate_slots()
     
     return {"message": "Marked as no-show", "status": "no_show"}
 
@@ -311,28 +349,39 @@ def get_upcoming_appointments(hours: int = 2, db: Session = Depends(get_db)):
     now = datetime.now()
     cutoff = now + timedelta(hours=hours)
     
-    appointments = db.query(Appointment).filter(
+    # Names are fetched below; any relationship access on these rows should fail loudly.
+    # notes is Text and not part of this view, so leave it unread
+    appointments = db.query(Appointment).options(
+        load_only(
+            Appointment.id, Appointment.customer_name, Appointment.customer_phone,
+            Appointment.barber_id, Appointment.service_type_id,
+            Appointment.scheduled_time, Appointment.status,
+        ),
+        raiseload("*"),
+    ).filter(
         Appointment.scheduled_time >= now,
         Appointment.scheduled_time <= cutoff,
-        Appointment.status.in_(["scheduled", "confirmed"])
+        Appointment.status.in_(BOOKED_STATUSES)
     ).order_by(Appointment.scheduled_time).all()
     
+    # Names only, one IN query per table for the distinct ids on the page
+    barber_ids = {a.barber_id for a in appointments if a.barber_id}
+    service_ids = {a.service_type_id for a in appointments}
+    barber_names = dict(
+        db.query(Barber.id, Barber.name).filter(Barber.id.in_(barber_ids)).all()
+    ) if barber_ids else {}
+    service_names = dict(
+        db.query(ServiceType.id, ServiceType.name).filter(ServiceType.id.in_(service_ids)).all()
+    ) if service_ids else {}
+    
     result = []
     for appt in appointments:
-        barber_name = None
-        if appt.barber_id:
-            barber = db.query(Barber).filter(Barber.id == appt.barber_id).first()
-            if barber:
-                barber_name = barber.name
-        
-        service = db.query(ServiceType).filter(ServiceType.id == appt.service_type_id).first()
-        
         result.append({
             "id": appt.id,
             "customer_name": appt.customer_name,
             "customer_phone": appt.customer_phone,
-            "barber_name": barber_name,
-            "service_name": service.name if service else "Unknown",
+            "barber_name": barber_names.get(appt.barber_id),
+            "service_name": service_names.get(appt.service_type_id, "Unknown"),
             "scheduled_time": appt.scheduled_time,
             "minutes_until": int((appt.scheduled_time - now).total_seconds() / 60),
             "status": appt.status
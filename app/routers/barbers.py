@@ -1,12 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy.orm import Session, load_only, raiseload
+from sqlalchemy import and_, func, select
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime, date, timedelta
 
 from app.database import get_db
-from app.models import Barber, TimeClock, Order, Payment, BarberBreak
+from app.cache import invalidate_barbers
+from app.models import Barber, BarberSpecialty, TimeClock, Order, Payment, BarberBreak
 
 router = APIRouter(prefix="/barbers", tags=["barbers"])
 
@@ -44,50 +46,62 @@ class BarberResponse(BaseModel):
         from_attributes = True
 
 
+# Plain rows with exactly the BarberResponse columns; no ORM instances to build
+BARBER_ROWS = select(
+    Barber.id,
+    Barber.name,
+    Barber.phone,
+    Barber.email,
+    Barber.commission_rate,
+    Barber.specialties,
+    Barber.is_active,
+    Barber.is_available,
+    Barber.created_at,
+)
+
+
 @router.get("/", response_model=List[BarberResponse])
-def list_barbers(active_only: bool = False, db: Session = Depends(get_db)):
-    query = db.query(Barber)
+def list_barbers(active_only: bool = False, specialty: Optional[str] = None, db: Session = Depends(get_db)):
+    stmt = BARBER_ROWS
     if active_only:
-        query = query.filter(Barber.is_active == True)
-    return query.all()
+        stmt = stmt.where(Barber.is_active == True)
+    if specialty:
+        stmt = stmt.join(BarberSpecialty).where(BarberSpecialty.specialty == specialty.strip().lower())
+    return db.execute(stmt).mappings().all()
 
 
 @router.get("/available")
 def list_available_barbers(db: Session = Depends(get_db)):
     """Get barbers who are currently available (clocked in and not busy)"""
-    barbers = db.query(Barber).filter(
-        Barber.is_active == True,
-        Barber.is_available == True
-    ).all()
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    # Clock-in state and active order count come back as correlated subqueries
+    is_clocked_in = select(TimeClock.id).where(
+        TimeClock.barber_id == Barber.id,
+        TimeClock.clock_in >= day_start,
+        TimeClock.clock_in < day_start + timedelta(days=1),
+        TimeClock.clock_out == None
+    ).exists()
+    active_orders = select(func.count(Order.id)).where(
+        Order.barber_id == Barber.id,
+        Order.status == "in_progress"
+    ).scalar_subquery()
     
-    result = []
-    for barber in barbers:
-        # Check if clocked in today
-        today = date.today()
-        clock = db.query(TimeClock).filter(
-            TimeClock.barber_id == barber.id,
-            func.date(TimeClock.clock_in) == today,
-            TimeClock.clock_out == None
-        ).first()
-        
-        # Count active orders
-        active_orders = db.query(Order).filter(
-            Order.barber_id == barber.id,
-            Order.status == "in_progress"
-        ).count()
-        
-        result.append({
-            **BarberResponse.model_validate(barber).model_dump(),
-            "is_clocked_in": clock is not None,
-            "active_orders": active_orders
-        })
+    rows = db.execute(
+        BARBER_ROWS.add_columns(
+            is_clocked_in.label("is_clocked_in"),
+            active_orders.label("active_orders")
+        ).where(
+            Barber.is_active == True,
+            Barber.is_available == True
+        )
+    ).mappings().all()
     
-    return result
+    return [{**row, "is_clocked_in": bool(row["is_clocked_in"])} for row in rows]
 
 
 @router.get("/{barber_id}", response_model=BarberResponse)
 def get_barber(barber_id: int, db: Session = Depends(get_db)):
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
+    barber = db.scalar(select(Barber).where(Barber.id == barber_id))
     if not barber:
         raise HTTPException(status_code=404, detail="Barber not found")
     return barber
@@ -95,42 +109,54 @@ def get_barber(barber_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=BarberResponse)
 def create_barber(barber: BarberCreate, db: Session = Depends(get_db)):
-    db_barber = Barber(**barber.model_dump())
+    db_barber = Barber(**barber.model_dump(exclude={"specialties"}))
+    db_barber.set_specialties(barber.specialties)
     db.add(db_barber)
     db.commit()
+    invalidate_barbers()
     db.refresh(db_barber)
     return db_barber
 
 
 @router.patch("/{barber_id}", response_model=BarberResponse)
 def update_barber(barber_id: int, barber: BarberUpdate, db: Session = Depends(get_db)):
-    db_barber = db.query(Barber).filter(Barber.id == barber_id).first()
+    db_barber = db.scalar(select(Barber).where(Barber.id == barber_id))
     if not db_barber:
         raise HTTPException(status_code=404, detail="Barber not found")
     
     update_data = barber.model_dump(exclude_unset=True)
+    if "specialties" in update_data:
+        db_barber.set_specialties(update_data.pop("specialties"))
     for field, value in update_data.items():
         setattr(db_barber, field, value)
     
     db.commit()
+    invalidate_barbers()
     db.refresh(db_barber)
     return db_barber
 
 
+def get_barber_with_open_shift(db: Session, barber_id: int):
+    """(barber, today's open TimeClock entry or None) in one query; 404 if no barber"""
+    day_start = datetime.combine(date.today(), datetime.min.time())
+    row = db.execute(
+        select(Barber, TimeClock).outerjoin(TimeClock, and_(
+            TimeClock.barber_id == Barber.id,
+            TimeClock.clock_in >= day_start,
+            TimeClock.clock_in < day_start + timedelta(days=1),
+            TimeClock.clock_out == None
+        )).where(Barber.id == barber_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Barber not found")
+    return row
+
+
 @router.post("/{barber_id}/clock-in")
 def clock_in(barber_id: int, db: Session = Depends(get_db)):
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
-    if not barber:
-        raise HTTPException(status_code=404, detail="Barber not found")
+    barber, existing = get_barber_with_open_shift(db, barber_id)
     
     # Check if already clocked in
-    today = date.today()
-    existing = db.query(TimeClock).filter(
-        TimeClock.barber_id == barber_id,
-        func.date(TimeClock.clock_in) == today,
-        TimeClock.clock_out == None
-    ).first()
-    
     if existing:
         raise HTTPException(status_code=400, detail="Already clocked in")
     
@@ -144,16 +170,7 @@ def clock_in(barber_id: int, db: Session = Depends(get_db)):
 
 @router.post("/{barber_id}/clock-out")
 def clock_out(barber_id: int, db: Session = Depends(get_db)):
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
-    if not barber:
-        raise HTTPException(status_code=404, detail="Barber not found")
-    
-    today = date.today()
-    entry = db.query(TimeClock).filter(
-        TimeClock.barber_id == barber_id,
-        func.date(TimeClock.clock_in) == today,
-        TimeClock.clock_out == None
-    ).first()
+    barber, entry = get_barber_with_open_shift(db, barber_id)
     
     if not entry:
         raise HTTPException(status_code=400, detail="Not clocked in")
@@ -180,7 +197,7 @@ def get_barber_earnings(
     end_date: Optional[date] = None,
     db: Session = Depends(get_db)
 ):
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
+    barber = db.scalar(select(Barber).where(Barber.id == barber_id))
     if not barber:
         raise HTTPException(status_code=404, detail="Barber not found")
     
@@ -189,24 +206,24 @@ def get_barber_earnings(
     if not end_date:
         end_date = date.today()
     
-    # Get completed orders in range
-    orders = db.query(Order).filter(
+    # Totals for completed orders in range, summed by the database
+    total_services, total_revenue, total_tips = db.query(
+        func.count(Order.id),
+        func.coalesce(func.sum(Order.subtotal), 0),
+        func.coalesce(func.sum(Order.tip), 0)
+    ).filter(
         Order.barber_id == barber_id,
         Order.status == "completed",
-        func.date(Order.completed_at) >= start_date,
-        func.date(Order.completed_at) <= end_date
-    ).all()
-    
-    total_services = len(orders)
-    total_revenue = sum(o.subtotal for o in orders)
-    total_tips = sum(o.tip for o in orders)
+        Order.completed_at >= datetime.combine(start_date, datetime.min.time()),
+        Order.completed_at < datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    ).one()
     commission = total_revenue * barber.commission_rate
     
     return {
         "barber_id": barber.id,
         "barber_name": barber.name,
-        "period_start": start_date.isoformat(),
-        "period_end": end_date.isoformat(),
+        "period_start": start_date,
+        "period_end": end_date,
         "commission_rate": barber.commission_rate,
         "total_services": total_services,
         "total_service_revenue": round(total_revenue, 2),
@@ -231,18 +248,24 @@ BREAK_DURATIONS = {
 }
 
 
+def get_barber_with_open_break(db: Session, barber_id: int):
+    """(barber, open BarberBreak or None) in one query; 404 if no barber"""
+    row = db.execute(
+        select(Barber, BarberBreak).outerjoin(BarberBreak, and_(
+            BarberBreak.barber_id == Barber.id,
+            BarberBreak.end_time.is_(None)
+        )).where(Barber.id == barber_id)
+    ).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Barber not found")
+    return row
+
+
 @router.post("/{barber_id}/break/start")
 def start_break(barber_id: int, data: BreakStart, db: Session = Depends(get_db)):
     """Start a break for a barber"""
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
-    if not barber:
-        raise HTTPException(status_code=404, detail="Barber not found")
-    
     # Check if already on break
-    active_break = db.query(BarberBreak).filter(
-        BarberBreak.barber_id == barber_id,
-        BarberBreak.end_time.is_(None)
-    ).first()
+    barber, active_break = get_barber_with_open_break(db, barber_id)
     
     if active_break:
         raise HTTPException(status_code=400, detail="Already on break")
@@ -262,7 +285,12 @@ def start_break(barber_id: int, data: BreakStart, db: Session = Depends(get_db))
     
     # Mark barber as unavailable
     barber.is_available = False
-    db.commit()
+    # uq_barber_breaks_open rejects a second open break started concurrently
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Already on break")
     db.refresh(break_record)
     
     return {
@@ -277,14 +305,7 @@ def start_break(barber_id: int, data: BreakStart, db: Session = Depends(get_db))
 @router.post("/{barber_id}/break/end")
 def end_break(barber_id: int, db: Session = Depends(get_db)):
     """End a barber's current break"""
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
-    if not barber:
-        raise HTTPException(status_code=404, detail="Barber not found")
-    
-    active_break = db.query(BarberBreak).filter(
-        BarberBreak.barber_id == barber_id,
-        BarberBreak.end_time.is_(None)
-    ).first()
+    barber, active_break = get_barber_with_open_break(db, barber_id)
     
     if not active_break:
         raise HTTPException(status_code=400, detail="Not currently on break")
@@ -306,14 +327,7 @@ def end_break(barber_id: int, db: Session = Depends(get_db)):
 @router.get("/{barber_id}/break/status")
 def get_break_status(barber_id: int, db: Session = Depends(get_db)):
     """Check if barber is currently on break"""
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
-    if not barber:
-        raise HTTPException(status_code=404, detail="Barber not found")
-    
-    active_break = db.query(BarberBreak).filter(
-        BarberBreak.barber_id == barber_id,
-        BarberBreak.end_time.is_(None)
-    ).first()
+    barber, active_break = get_barber_with_open_break(db, barber_id)
     
     if not active_break:
         return {
@@ -322,12 +336,13 @@ def get_break_status(barber_id: int, db: Session = Depends(get_db)):
             "is_available": barber.is_available
         }
     
-    elapsed = (datetime.utcnow() - active_break.start_time).total_seconds() / 60
+    now = datetime.utcnow()
+    elapsed = (now - active_break.start_time).total_seconds() / 60
     remaining = 0
     over_time = False
     
     if active_break.scheduled_end_time:
-        remaining = (active_break.scheduled_end_time - datetime.utcnow()).total_seconds() / 60
+        remaining = (active_break.scheduled_end_time - now).total_seconds() / 60
         if remaining < 0:
             over_time = True
             remaining = abs(remaining)
@@ -348,19 +363,28 @@ def get_break_status(barber_id: int, db: Session = Depends(get_db)):
 @router.get("/breaks/active")
 def get_all_active_breaks(db: Session = Depends(get_db)):
     """Get all barbers currently on break"""
-    active_breaks = db.query(BarberBreak).filter(
+    # Names come from the join; a lazy load of BarberBreak.barber should fail loudly
+    active_breaks = db.query(BarberBreak, Barber.name).outerjoin(
+        Barber, Barber.id == BarberBreak.barber_id
+    ).options(
+        load_only(
+            BarberBreak.id, BarberBreak.barber_id, BarberBreak.break_type,
+            BarberBreak.start_time, BarberBreak.scheduled_end_time,
+        ),
+        raiseload("*"),
+    ).filter(
         BarberBreak.end_time.is_(None)
     ).all()
     
+    now = datetime.utcnow()
     result = []
-    for brk in active_breaks:
-        barber = db.query(Barber).filter(Barber.id == brk.barber_id).first()
-        elapsed = (datetime.utcnow() - brk.start_time).total_seconds() / 60
+    for brk, barber_name in active_breaks:
+        elapsed = (now - brk.start_time).total_seconds() / 60
         
         over_time = False
         remaining = 0
         if brk.scheduled_end_time:
-            remaining = (brk.scheduled_end_time - datetime.utcnow()).total_seconds() / 60
+            remaining = (brk.scheduled_end_time - now).total_seconds() / 60
             if remaining < 0:
                 over_time = True
                 remaining = abs(remaining)
@@ -368,7 +392,7 @@ def get_all_active_breaks(db: Session = Depends(get_db)):
         result.append({
             "break_id": brk.id,
             "barber_id": brk.barber_id,
-            "barber_name": barber.name if barber else "Unknown",
+            "barber_name": barber_name or "Unknown",
             "break_type": brk.break_type,
             "start_time": brk.start_time,
             "elapsed_minutes": round(elapsed, 1),
@@ -383,30 +407,38 @@ def get_all_active_breaks(db: Session = Depends(get_db)):
 def get_barber_breaks_today(barber_id: int, db: Session = Depends(get_db)):
     """Get all breaks for a barber today"""
     today = date.today()
+    day_start = datetime.combine(today, datetime.min.time())
+    
+    rows = db.execute(
+        select(BarberBreak.id, BarberBreak.break_type, BarberBreak.start_time, BarberBreak.end_time).where(
+            BarberBreak.barber_id == barber_id,
+            BarberBreak.start_time >= day_start,
+            BarberBreak.start_time < day_start + timedelta(days=1)
+        ).order_by(BarberBreak.start_time)
+    ).all()
     
-    breaks = db.query(BarberBreak).filter(
-        BarberBreak.barber_id == barber_id,
-        func.date(BarberBreak.start_time) == today
-    ).order_by(BarberBreak.start_time).all()
-    
+    # One pass: each duration is computed once and feeds both the row and the totals
+    breaks = []
     total_break_time = 0
-    for brk in breaks:
-        if brk.end_time:
-            total_break_time += (brk.end_time - brk.start_time).total_seconds() / 60
+    break_count = 0
+    for break_id, break_type, start_time, end_time in rows:
+        duration = None
+        if end_time:
+            duration = (end_time - start_time).total_seconds() / 60
+            total_break_time += duration
+            break_count += 1
+        breaks.append({
+            "id": break_id,
+            "break_type": break_type,
+            "start_time": start_time,
+            "end_time": end_time,
+            "duration_minutes": round(duration, 1) if duration is not None else None
+        })
     
     return {
         "barber_id": barber_id,
-        "date": today.isoformat(),
+        "date": today,
         "total_break_minutes": round(total_break_time, 1),
-        "break_count": len([b for b in breaks if b.end_time]),
-        "breaks": [
-            {
-                "id": b.id,
-                "break_type": b.break_type,
-                "start_time": b.start_time,
-                "end_time": b.end_time,
-                "duration_minutes": round((b.end_time - b.start_time).total_seconds() / 60, 1) if b.end_time else None
-            }
-            for b in breaks
-        ]
+        "break_count": break_count,
+        "breaks": breaks
     }
@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
+from sqlalchemy import insert
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, date, timedelta
 
 from app.database import get_db
+from app.cache import get_hours_by_day, get_open_status, invalidate_holidays, invalidate_hours
 from app.models import BusinessHours, Holiday
 
 router = APIRouter(prefix="/business", tags=["Business Hours"])
@@ -30,7 +32,7 @@ class HolidayCreate(BaseModel):
 @router.get("/hours")
 def get_business_hours(db: Session = Depends(get_db)):
     """Get all business hours"""
-    hours = db.query(BusinessHours).order_by(BusinessHours.day_of_week).all()
+    hours = get_hours_by_day(db)
     
     # If no hours set, return defaults
     if not hours:
@@ -51,13 +53,13 @@ def get_business_hours(db: Session = Depends(get_db)):
                 "close": h.close_time,
                 "is_closed": h.is_closed
             }
-            for h in hours
+            for h in hours.values()
         ],
         "is_default": False
     }
 
 
-@router.post("/hours/{day_of_week}")
+@router.post("/hours/{day_of_week}", status_code=204)
 def set_hours(day_of_week: int, hours: HoursUpdate, db: Session = Depends(get_db)):
     """Set hours for a specific day"""
     if day_of_week < 0 or day_of_week > 6:
@@ -79,35 +81,45 @@ def set_hours(day_of_week: int, hours: HoursUpdate, db: Session = Depends(get_db
         db.add(new_hours)
     
     db.commit()
-    return {"message": f"Hours set for {DAY_NAMES[day_of_week]}"}
+    invalidate_hours()
+    return Response(status_code=204)
 
 
-@router.post("/hours/bulk")
+@router.post("/hours/bulk", status_code=204)
 def set_all_hours(hours_list: List[HoursUpdate], db: Session = Depends(get_db)):
     """Set hours for all days at once"""
     if len(hours_list) != 7:
         raise HTTPException(status_code=400, detail="Must provide hours for all 7 days")
     
-    # Clear existing
-    db.query(BusinessHours).delete()
+    # Update rows in place (no delete/re-insert, so readers never see an empty week)
+    existing = {h.day_of_week: h for h in db.query(BusinessHours).all()}
     
     for day, hours in enumerate(hours_list):
-        new_hours = BusinessHours(
-            day_of_week=day,
-            open_time=hours.open_time,
-            close_time=hours.close_time,
-            is_closed=hours.is_closed
-        )
-        db.add(new_hours)
+        row = existing.get(day)
+        if row is None:
+            row = BusinessHours(day_of_week=day)
+            db.add(row)
+        row.open_time = hours.open_time
+        row.close_time = hours.close_time
+        row.is_closed = hours.is_closed
     
     db.commit()
-    return {"message": "All hours updated"}
+    invalidate_hours()
+    return Response(status_code=204)
 
 
 @router.get("/status")
 def get_current_status(db: Session = Depends(get_db)):
     """Get current open/closed status"""
     now = datetime.now()
+    return get_open_status(
+        (now.date(), now.strftime("%H:%M")),
+        lambda: compute_current_status(db, now),
+    )
+
+
+def compute_current_status(db: Session, now: datetime) -> dict:
+    """Open/closed status at `now`, read straight from the database"""
     today = now.weekday()
     current_time = now.strftime("%H:%M")
     
@@ -159,23 +171,29 @@ def get_next_open(db: Session) -> dict:
     """Find when shop next opens"""
     now = datetime.now()
     
+    # Prefetch the week's closures and the weekly hours instead of querying per day
+    week_start = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    closed_dates = {
+        d.date() for (d,) in db.query(Holiday.date).filter(
+            Holiday.date >= week_start,
+            Holiday.date < week_start + timedelta(days=7),
+            Holiday.is_closed == True
+        ).all()
+    }
+    hours_by_day = get_hours_by_day(db)
+    
     for i in range(1, 8):
         check_date = now + timedelta(days=i)
         day_of_week = check_date.weekday()
         
-        # Check for holiday
-        holiday = db.query(Holiday).filter(
-            Holiday.date == check_date.date()
-        ).first()
-        
-        if holiday and holiday.is_closed:
+        if check_date.date() in closed_dates:
             continue
         
-        hours = db.query(BusinessHours).filter(BusinessHours.day_of_week == day_of_week).first()
+        hours = hours_by_day.get(day_of_week)
         
         if hours and not hours.is_closed:
             return {
-                "date": check_date.date().isoformat(),
+                "date": check_date.date(),
                 "day": DAY_NAMES[day_of_week],
                 "opens_at": hours.open_time
             }
@@ -198,7 +216,7 @@ def get_holidays(upcoming_only: bool = True, db: Session = Depends(get_db)):
     return [
         {
             "id": h.id,
-            "date": h.date.date().isoformat() if isinstance(h.date, datetime) else h.date.isoformat(),
+            "date": h.date.date() if isinstance(h.date, datetime) else h.date,
             "name": h.name,
             "is_closed": h.is_closed,
             "modified_hours": h.modified_hours
@@ -225,12 +243,12 @@ def add_holiday(holiday: HolidayCreate, db: Session = Depends(get_db)):
     )
     db.add(db_holiday)
     db.commit()
-    db.refresh(db_holiday)
+    invalidate_holidays()
     
     return {"message": "Holiday added", "id": db_holiday.id}
 
 
-@router.delete("/holidays/{holiday_id}")
+@router.delete("/holidays/{holiday_id}", status_code=204)
 def delete_holiday(holiday_id: int, db: Session = Depends(get_db)):
     """Delete a holiday"""
     holiday = db.query(Holiday).filter(Holiday.id == holiday_id).first()
@@ -239,7 +257,8 @@ def delete_holiday(holiday_id: int, db: Session = Depends(get_db)):
     
     db.delete(holiday)
     db.commit()
-    return {"message": "Holiday deleted"}
+    invalidate_holidays()
+    return Response(status_code=204)
 
 
 @router.post("/holidays/add-common")
@@ -252,15 +271,24 @@ def add_common_holidays(year: int, db: Session = Depends(get_db)):
         (f"{year}-12-25", "Christmas Day"),
     ]
     
-    added = 0
+    # One lookup for the year's existing dates, then one multi-row INSERT for the rest
+    year_start = datetime(year, 1, 1)
+    existing = {
+        d.date() for (d,) in db.query(Holiday.date).filter(
+            Holiday.date >= year_start,
+            Holiday.date < datetime(year + 1, 1, 1)
+        ).all()
+    }
+    rows = []
     for date_str, name in common_holidays:
         holiday_date = datetime.strptime(date_str, "%Y-%m-%d")
-        
-        existing = db.query(Holiday).filter(Holiday.date == holiday_date.date()).first()
-        if not existing:
-            db_holiday = Holiday(date=holiday_date, name=name, is_closed=True)
-            db.add(db_holiday)
-            added += 1
+        if holiday_date.date() not in existing:
+            rows.append({"date": holiday_date, "name": name, "is_closed": True})
+    
+    if rows:
+        db.execute(insert(Holiday).values(rows))
+    added = len(rows)
     
     db.commit()
+    invalidate_holidays()
     return {"message": f"Added {added} holidays for {year}"}
@@ -1,24 +1,191 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime, date
+from array import array
+import os
+import threading
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks
+    fcntl = None
+import time
+import orjson
 
 from app.database import get_db
 
 router = APIRouter(prefix="/cash-drawer", tags=["cash_drawer"])
 
-# In-memory cash drawer state (would be DB in production)
-drawer_state = {
-    "is_open": False,
-    "opened_at": None,
-    "starting_cash": 0.0,
-    "cash_sales": 0.0,
-    "cash_added": 0.0,
-    "cash_removed": 0.0,
-    "transactions": []
-}
+# Longer transaction lists are streamed in batches instead of encoded in one piece
+STREAM_AFTER = 500
+STREAM_BATCH = 250
+
+# Append-only JSONL journal of drawer events, replayed at startup so a restart keeps the day
+DRAWER_LOG_PATH = os.getenv("CASH_DRAWER_LOG", "./cash_drawer.log")
+# Group commit: fsync after this many events, or this many seconds after the first unsynced one
+FSYNC_EVERY = 32
+FSYNC_INTERVAL = 0.2
+
+
+class Drawer:
+    """Cash drawer session; transactions are kept as parallel columns"""
+    # Explicit __slots__ rather than @dataclass(slots=True), which needs Python 3.10
+    __slots__ = (
+        "is_open", "opened_at", "starting_cash", "cash_sales", "cash_added", "cash_removed",
+        "types", "amounts", "notes", "times",
+    )
+
+    def __init__(self):
+        self.is_open = False
+        # Epoch seconds; formatted only when read
+        self.opened_at: Optional[float] = None
+        self.starting_cash = 0.0
+        self.cash_sales = 0.0
+        self.cash_added = 0.0
+        self.cash_removed = 0.0
+        self.types: list = []
+        self.amounts = array("d")
+        self.notes: list = []
+        self.times = array("d")
+
+    @property
+    def current_cash(self) -> float:
+        return self.starting_cash + self.cash_sales + self.cash_added - self.cash_removed
+
+    def record(self, txn_type: str, amount: float, note: Optional[str], timestamp: float):
+        self.types.append(txn_type)
+        self.amounts.append(amount)
+        self.notes.append(note)
+        self.times.append(timestamp)
+
+    def reset(self, starting_cash: float, opened_at: float):
+        """Start a new session, reusing the column buffers"""
+        self.is_open = True
+        self.opened_at = opened_at
+        self.starting_cash = starting_cash
+        self.cash_sales = 0.0
+        self.cash_added = 0.0
+        self.cash_removed = 0.0
+        self.types.clear()
+        del self.amounts[:]
+        self.notes.clear()
+        del self.times[:]
+
+    def apply(self, event: dict):
+        """Apply one journal event (live or replayed)"""
+        op = event["op"]
+        if op == "open":
+            self.reset(event["starting_cash"], event["time"])
+        elif op == "close":
+            self.is_open = False
+        else:
+            if op == "sale":
+                self.cash_sales += event["amount"]
+            elif op == "add":
+                self.cash_added += event["amount"]
+            else:
+                self.cash_removed += event["amount"]
+            self.record(op, event["amount"], event["note"], event["time"])
+
+
+class DrawerLog:
+    """Drawer state and its event journal; callers hold `lock`"""
+
+    def __init__(self, path: str):
+        self.path = path
+        # Handlers run on threadpool workers; every read-modify-write holds this
+        self.lock = threading.Lock()
+        self.drawer = Drawer()
+        self.file = None
+        self.pending = 0
+        self.timer = None
+
+    def open(self):
+        """Replay existing events into the drawer, then open for appending"""
+        torn_tail = False
+        if os.path.exists(self.path):
+            with open(self.path, "rb") as f:
+                for line in f:
+                    torn_tail = not line.endswith(b"\n")
+                    try:
+                        self.drawer.apply(orjson.loads(line))
+                    except (orjson.JSONDecodeError, KeyError):
+                        continue  # Partial write from a crash
+        self._open_file()
+        if torn_tail:
+            self.file.write(b"\n")
+
+    def _open_file(self):
+        self.file = open(self.path, "ab")
+        if fcntl is not None:
+            # A second process appending to the same journal would interleave sessions
+            try:
+                fcntl.flock(self.file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                self.file.close()
+                raise RuntimeError(f"{self.path} is in use by another process; run the drawer on one worker")
+
+    def close(self):
+        with self.lock:
+            self.sync()
+            self.file.close()
+
+    def commit(self, event: dict):
+        """Journal an event, then apply it"""
+        self.append(event)
+        self.drawer.apply(event)
+
+    def append(self, event: dict):
+        # Flushed to the OS on every event; only the fsync is grouped
+        self.file.write(orjson.dumps(event, option=orjson.OPT_APPEND_NEWLINE))
+        self.file.flush()
+        self.pending += 1
+        if self.pending >= FSYNC_EVERY:
+            self.sync()
+        elif self.timer is None:
+            self.timer = threading.Timer(FSYNC_INTERVAL, self._timed_sync)
+            self.timer.daemon = True
+            self.timer.start()
+
+    def sync(self):
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if self.pending:
+            os.fsync(self.file.fileno())
+            self.pending = 0
+
+    def _timed_sync(self):
+        with self.lock:
+            self.timer = None
+            if not self.file.closed:
+                self.sync()
+
+    def rotate(self, closed_at: float):
+        """Archive the closed session's journal and start an empty one"""
+        self.sync()
+        self.file.close()
+        suffix = datetime.utcfromtimestamp(closed_at).strftime("%Y%m%d-%H%M%S")
+        os.replace(self.path, f"{self.path}.{suffix}")
+        self._open_file()
+
+
+def open_drawer_log(path: str = DRAWER_LOG_PATH) -> DrawerLog:
+    """Drawer restored from its journal; opened at app startup"""
+    log = DrawerLog(path)
+    log.open()
+    return log
+
+
+def get_drawer_log(request: Request) -> DrawerLog:
+    return request.app.state.drawer_log
+
+
+def _iso(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.utcfromtimestamp(timestamp).isoformat() if timestamp is not None else None
 
 
 class CashTransaction(BaseModel):
@@ -32,40 +199,30 @@ class DrawerOpen(BaseModel):
 
 
 @router.get("/status")
-def get_drawer_status():
+def get_drawer_status(log: DrawerLog = Depends(get_drawer_log)):
     """Get current drawer status"""
-    current_cash = (
-        drawer_state["starting_cash"] + 
-        drawer_state["cash_sales"] + 
-        drawer_state["cash_added"] - 
-        drawer_state["cash_removed"]
-    )
-    
-    return {
-        "is_open": drawer_state["is_open"],
-        "opened_at": drawer_state["opened_at"],
-        "starting_cash": drawer_state["starting_cash"],
-        "cash_sales": drawer_state["cash_sales"],
-        "cash_added": drawer_state["cash_added"],
-        "cash_removed": drawer_state["cash_removed"],
-        "current_cash": round(current_cash, 2),
-        "transactions_count": len(drawer_state["transactions"])
-    }
+    with log.lock:
+        drawer = log.drawer
+        return {
+            "is_open": drawer.is_open,
+            "opened_at": _iso(drawer.opened_at),
+            "starting_cash": drawer.starting_cash,
+            "cash_sales": drawer.cash_sales,
+            "cash_added": drawer.cash_added,
+            "cash_removed": drawer.cash_removed,
+            "current_cash": round(drawer.current_cash, 2),
+            "transactions_count": len(drawer.types)
+        }
 
 
 @router.post("/open")
-def open_drawer(data: DrawerOpen):
+def open_drawer(data: DrawerOpen, log: DrawerLog = Depends(get_drawer_log)):
     """Open cash drawer for the day"""
-    if drawer_state["is_open"]:
-        return {"error": "Drawer already open"}
-    
-    drawer_state["is_open"] = True
-    drawer_state["opened_at"] = datetime.utcnow().isoformat()
-    drawer_state["starting_cash"] = data.starting_cash
-    drawer_state["cash_sales"] = 0.0
-    drawer_state["cash_added"] = 0.0
-    drawer_state["cash_removed"] = 0.0
-    drawer_state["transactions"] = []
+    with log.lock:
+        drawer = log.drawer
+        if drawer.is_open:
+            return {"error": "Drawer already open"}
+        log.commit({"op": "open", "starting_cash": data.starting_cash, "time": time.time()})
     
     return {
         "message": "Drawer opened",
@@ -74,86 +231,96 @@ def open_drawer(data: DrawerOpen):
 
 
 @router.post("/close")
-def close_drawer():
+def close_drawer(log: DrawerLog = Depends(get_drawer_log)):
     """Close and reconcile cash drawer"""
-    if not drawer_state["is_open"]:
-        return {"error": "Drawer not open"}
-    
-    current_cash = (
-        drawer_state["starting_cash"] + 
-        drawer_state["cash_sales"] + 
-        drawer_state["cash_added"] - 
-        drawer_state["cash_removed"]
-    )
-    
-    summary = {
-        "opened_at": drawer_state["opened_at"],
-        "closed_at": datetime.utcnow().isoformat(),
-        "starting_cash": drawer_state["starting_cash"],
-        "cash_sales": round(drawer_state["cash_sales"], 2),
-        "cash_added": round(drawer_state["cash_added"], 2),
-        "cash_removed": round(drawer_state["cash_removed"], 2),
-        "expected_cash": round(current_cash, 2),
-        "transactions_count": len(drawer_state["transactions"])
-    }
-    
-    drawer_state["is_open"] = False
+    with log.lock:
+        drawer = log.drawer
+        if not drawer.is_open:
+            return {"error": "Drawer not open"}
+        
+        closed_at = time.time()
+        summary = {
+            "opened_at": _iso(drawer.opened_at),
+            "closed_at": _iso(closed_at),
+            "starting_cash": drawer.starting_cash,
+            "cash_sales": round(drawer.cash_sales, 2),
+            "cash_added": round(drawer.cash_added, 2),
+            "cash_removed": round(drawer.cash_removed, 2),
+            "expected_cash": round(drawer.current_cash, 2),
+            "transactions_count": len(drawer.types)
+        }
+        log.commit({"op": "close", "time": closed_at})
+        log.rotate(closed_at)
     
     return {"message": "Drawer closed", "summary": summary}
 
 
 @router.post("/sale")
-def record_sale(transaction: CashTransaction):
+def record_sale(transaction: CashTransaction, log: DrawerLog = Depends(get_drawer_log)):
     """Record a cash sale"""
-    if not drawer_state["is_open"]:
-        return {"error": "Drawer not open"}
-    
-    drawer_state["cash_sales"] += transaction.amount
-    drawer_state["transactions"].append({
-        "type": "sale",
-        "amount": transaction.amount,
-        "note": transaction.note,
-        "time": datetime.utcnow().isoformat()
-    })
+    with log.lock:
+        drawer = log.drawer
+        if not drawer.is_open:
+            return {"error": "Drawer not open"}
+        log.commit({"op": "sale", "amount": transaction.amount, "note": transaction.note, "time": time.time()})
     
     return {"message": "Sale recorded", "amount": transaction.amount}
 
 
 @router.post("/add")
-def add_cash(transaction: CashTransaction):
+def add_cash(transaction: CashTransaction, log: DrawerLog = Depends(get_drawer_log)):
     """Add cash to drawer (e.g., making change)"""
-    if not drawer_state["is_open"]:
-        return {"error": "Drawer not open"}
-    
-    drawer_state["cash_added"] += transaction.amount
-    drawer_state["transactions"].append({
-        "type": "add",
-        "amount": transaction.amount,
-        "note": transaction.note,
-        "time": datetime.utcnow().isoformat()
-    })
+    with log.lock:
+        drawer = log.drawer
+        if not drawer.is_open:
+            return {"error": "Drawer not open"}
+        log.commit({"op": "add", "amount": transaction.amount, "note": transaction.note, "time": time.time()})
     
     return {"message": "Cash added", "amount": transaction.amount}
 
 
 @router.post("/remove")
-def remove_cash(transaction: CashTransaction):
+def remove_cash(transaction: CashTransaction, log: DrawerLog = Depends(get_drawer_log)):
     """Remove cash from drawer (e.g., safe drop)"""
-    if not drawer_state["is_open"]:
-        return {"error": "Drawer not open"}
-    
-    drawer_state["cash_removed"] += transaction.amount
-    drawer_state["transactions"].append({
-        "type": "remove",
-        "amount": transaction.amount,
-        "note": transaction.note,
-        "time": datetime.utcnow().isoformat()
-    })
+    with log.lock:
+        drawer = log.drawer
+        if not drawer.is_open:
+            return {"error": "Drawer not open"}
+        log.commit({"op": "remove", "amount": transaction.amount, "note": transaction.note, "time": time.time()})
     
     return {"message": "Cash removed", "amount": transaction.amount}
 
 
 @router.get("/transactions")
-def get_transactions():
+def get_transactions(log: DrawerLog = Depends(get_drawer_log)):
     """Get all transactions for current session"""
-    return drawer_state["transactions"]
+    # Copy the columns so a reopen (which clears them in place) can't cut into the response
+    with log.lock:
+        drawer = log.drawer
+        columns = (
+            drawer.types[:],
+            drawer.amounts[:],
+            drawer.notes[:],
+            drawer.times[:]
+        )
+    count = len(columns[0])
+    if count <= STREAM_AFTER:
+        return _transactions(columns, 0, count)
+    return StreamingResponse(_stream_transactions(columns, count), media_type="application/json")
+
+
+def _transactions(columns: tuple, start: int, stop: int) -> list:
+    return [
+        {"type": t, "amount": amount, "note": note, "time": _iso(timestamp)}
+        for t, amount, note, timestamp in zip(*(column[start:stop] for column in columns))
+    ]
+
+
+def _stream_transactions(columns: tuple, count: int):
+    yield b"["
+    for start in range(0, count, STREAM_BATCH):
+        batch = b",".join(
+            orjson.dumps(t) for t in _transactions(columns, start, min(start + STREAM_BATCH, count))
+        )
+        yield (b"," + batch) if start else batch
+    yield b"]"
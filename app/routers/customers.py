@@ -1,13 +1,19 @@
+import calendar
+import re
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import and_, extract, func, insert, or_, select, update
+from sqlalchemy.exc import IntegrityError
 from typing import List, Optional
 from pydantic import BaseModel
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from typing import Optional
 
 from app.database import get_db
-from app.models import Customer, Order, OrderService, ServiceType, CustomerServiceNote
+from app.cache import get_birthdays, invalidate_birthdays
+from app.responses import static_response
+from app.models import Customer, CustomerTag, Order, OrderService, ServiceType, CustomerServiceNote
 
 router = APIRouter(prefix="/customers", tags=["customers"])
 
@@ -46,19 +52,50 @@ class CustomerResponse(BaseModel):
         from_attributes = True
 
 
+# Exactly the CustomerResponse columns; plain rows, no ORM instances to build
+CUSTOMER_COLUMNS = (
+    Customer.id,
+    Customer.name,
+    Customer.phone,
+    Customer.email,
+    Customer.preferred_barber_id,
+    Customer.preferred_cut,
+    Customer.notes,
+    Customer.created_at,
+)
+
+# SQLite names the column ("customers.phone"); Postgres names the unique index
+PHONE_CONFLICT_MARKERS = ("customers.phone", "ix_customers_phone")
+
+
+def is_phone_conflict(exc: IntegrityError) -> bool:
+    """True when the violated constraint is the unique phone index"""
+    diag = getattr(exc.orig, "diag", None)
+    constraint = getattr(diag, "constraint_name", None)
+    if constraint:
+        return constraint == "ix_customers_phone"
+    message = str(exc.orig)
+    return "UNIQUE" in message.upper() and any(m in message for m in PHONE_CONFLICT_MARKERS)
+
+
 @router.get("/", response_model=List[CustomerResponse])
 def list_customers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return db.query(Customer).offset(skip).limit(limit).all()
+    return db.execute(
+        select(*CUSTOMER_COLUMNS).offset(skip).limit(limit)
+    ).mappings().all()
 
 
 @router.get("/search")
 def search_customers(q: str, db: Session = Depends(get_db)):
-    results = db.query(Customer).filter(
-        or_(
-            Customer.phone.contains(q),
-            Customer.name.ilike(f"%{q}%")
-        )
-    ).limit(10).all()
+    # Every customer column, as plain rows rather than ORM instances
+    results = db.execute(
+        select(Customer.__table__).where(
+            or_(
+                Customer.phone.contains(q),
+                Customer.name.ilike(f"%{q}%")
+            )
+        ).limit(10)
+    ).mappings().all()
     return results
 
 
@@ -72,31 +109,91 @@ def get_customer(customer_id: int, db: Session = Depends(get_db)):
 
 @router.post("/", response_model=CustomerResponse)
 def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
-    # Check if phone already exists
-    existing = db.query(Customer).filter(Customer.phone == customer.phone).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Phone number already registered")
-    
-    db_customer = Customer(**customer.model_dump())
+    data = customer.model_dump()
+    if data["birthday"]:
+        data["birthday"] = parse_birthday(data["birthday"])
+    db_customer = Customer(**data)
     db.add(db_customer)
-    db.commit()
+    # The unique phone index rejects duplicates; no pre-check query on the common path
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not is_phone_conflict(exc):
+            raise
+        raise HTTPException(status_code=400, detail="Phone number already registered")
+    invalidate_birthdays()
     db.refresh(db_customer)
     return db_customer
 
 
+@router.post("/bulk")
+def bulk_create_customers(customers: List[CustomerCreate], db: Session = Depends(get_db)):
+    """Create many customers in one transaction; phones already registered are skipped"""
+    rows = {}
+    skipped = []
+    for customer in customers:
+        if customer.phone in rows:
+            skipped.append(customer.phone)
+            continue
+        row = customer.model_dump()
+        if row["birthday"]:
+            row["birthday"] = parse_birthday(row["birthday"])
+        rows[customer.phone] = row
+    
+    if rows:
+        # One IN query for every phone instead of a lookup per customer
+        existing = set(db.scalars(select(Customer.phone).where(Customer.phone.in_(rows))))
+        skipped.extend(phone for phone in rows if phone in existing)
+        rows = [row for phone, row in rows.items() if phone not in existing]
+    
+    ids = []
+    if rows:
+        stmt = insert(Customer).returning(Customer.id, sort_by_parameter_order=True)
+        try:
+            ids = db.execute(stmt, rows).scalars().all()
+            db.commit()
+        except IntegrityError as exc:
+            db.rollback()
+            if not is_phone_conflict(exc):
+                raise
+            raise HTTPException(status_code=400, detail="Phone number already registered")
+        invalidate_birthdays()
+    
+    return {"created": len(ids), "ids": ids, "skipped_phones": skipped}
+
+
 @router.patch("/{customer_id}", response_model=CustomerResponse)
 def update_customer(customer_id: int, customer: CustomerUpdate, db: Session = Depends(get_db)):
-    db_customer = db.query(Customer).filter(Customer.id == customer_id).first()
-    if not db_customer:
-        raise HTTPException(status_code=404, detail="Customer not found")
-    
     update_data = customer.model_dump(exclude_unset=True)
-    for field, value in update_data.items():
-        setattr(db_customer, field, value)
-    
-    db.commit()
-    db.refresh(db_customer)
-    return db_customer
+    if not update_data:
+        row = db.execute(
+            select(*CUSTOMER_COLUMNS).where(Customer.id == customer_id)
+        ).mappings().first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        return row
+    if update_data.get("birthday"):
+        update_data["birthday"] = parse_birthday(update_data["birthday"])
+    
+    # One UPDATE ... RETURNING; nothing is loaded into the session
+    try:
+        row = db.execute(
+            update(Customer)
+            .where(Customer.id == customer_id)
+            .values(**update_data)
+            .returning(*CUSTOMER_COLUMNS)
+        ).mappings().first()
+        if not row:
+            raise HTTPException(status_code=404, detail="Customer not found")
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        if not is_phone_conflict(exc):
+            raise
+        raise HTTPException(status_code=400, detail="Phone number already registered")
+    invalidate_birthdays()
+    return row
 
 
 @router.get("/{customer_id}/history")
@@ -105,36 +202,38 @@ def get_customer_history(customer_id: int, db: Session = Depends(get_db)):
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Get order history
-    orders = db.query(Order).filter(
-        Order.customer_id == customer_id,
-        Order.status == "completed"
-    ).order_by(Order.completed_at.desc()).limit(20).all()
-    
-    # Calculate stats
-    total_visits = len(orders)
-    total_spent = sum(o.total for o in orders)
-    avg_tip = sum(o.tip for o in orders) / total_visits if total_visits > 0 else 0
-    
-    # Find favorite services
-    service_counts = {}
-    for order in orders:
-        for os in order.services:
-            svc = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
-            if svc:
-                service_counts[svc.name] = service_counts.get(svc.name, 0) + os.quantity
-    
-    favorite_services = sorted(service_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+    completed = (Order.customer_id == customer_id, Order.status == "completed")
+    
+    # Calculate stats in the database
+    total_visits, total_spent, total_tips = db.query(
+        func.count(Order.id), func.sum(Order.total), func.sum(Order.tip)
+    ).filter(*completed).one()
+    total_spent = total_spent or 0
+    avg_tip = (total_tips or 0) / total_visits if total_visits > 0 else 0
+    
+    # Find favorite services; ties go to the most recently ordered
+    quantity = func.sum(OrderService.quantity)
+    favorite_services = db.query(ServiceType.name, quantity).join(
+        OrderService, OrderService.service_type_id == ServiceType.id
+    ).join(
+        Order, Order.id == OrderService.order_id
+    ).filter(*completed).group_by(ServiceType.name).order_by(
+        quantity.desc(), func.max(Order.completed_at).desc()
+    ).limit(3).all()
     
     # Recent visits details
+    # Line items and their service types come back in the same statement
+    orders = db.query(Order).options(
+        joinedload(Order.services).joinedload(OrderService.service_type)
+    ).filter(*completed).order_by(Order.completed_at.desc()).limit(10).all()
+    
     recent_visits = []
-    for order in orders[:10]:
+    for order in orders:
         services = []
         for os in order.services:
-            svc = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
-            if svc:
+            if os.service_type:
                 services.append({
-                    "name": svc.name,
+                    "name": os.service_type.name,
                     "price": os.unit_price
                 })
         recent_visits.append({
@@ -167,6 +266,43 @@ def get_customer_history(customer_id: int, db: Session = Depends(get_db)):
     }
 
 
+def birthday_in_year(birthday: datetime, year: int) -> date:
+    """The customer's birthday in `year`; Feb 29 falls on Feb 28 in common years"""
+    if birthday.month == 2 and birthday.day == 29 and not calendar.isleap(year):
+        return date(year, 2, 28)
+    return date(year, birthday.month, birthday.day)
+
+
+def birthday_window(start: date, end: date):
+    """Filter for birthdays from start to end by month/day, one (month, day range) term per month"""
+    month = extract("month", Customer.birthday)
+    day = extract("day", Customer.birthday)
+    terms = []
+    current = start
+    while (current.year, current.month) < (end.year, end.month):
+        # Whole rest of the month, Feb 29 included in common years
+        terms.append(and_(month == current.month, day >= current.day))
+        current = date(current.year + current.month // 12, current.month % 12 + 1, 1)
+    terms.append(and_(month == current.month, day.between(current.day, end.day)))
+    return or_(*terms)
+
+
+# Optional YYYY- prefix, then MM-DD
+BIRTHDAY_PATTERN = re.compile(r"^(?:(\d{4})-)?(\d{1,2})-(\d{1,2})$")
+
+
+def parse_birthday(birthday: str) -> datetime:
+    """Parse MM-DD or YYYY-MM-DD; 400 if it is neither"""
+    match = BIRTHDAY_PATTERN.match(birthday)
+    try:
+        if not match:
+            raise ValueError(birthday)
+        year, month, day = match.groups()
+        return datetime(int(year or 2000), int(month), int(day))  # Use 2000 as placeholder year
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid birthday format. Use MM-DD or YYYY-MM-DD")
+
+
 @router.patch("/{customer_id}/birthday")
 def set_customer_birthday(customer_id: int, birthday: str, db: Session = Depends(get_db)):
     """Set customer birthday (format: MM-DD or YYYY-MM-DD)"""
@@ -174,18 +310,11 @@ def set_customer_birthday(customer_id: int, birthday: str, db: Session = Depends
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    # Parse birthday - accept MM-DD or YYYY-MM-DD
-    try:
-        if len(birthday) == 5:  # MM-DD
-            month, day = birthday.split("-")
-            bday = datetime(2000, int(month), int(day))  # Use 2000 as placeholder year
-        else:  # YYYY-MM-DD
-            bday = datetime.strptime(birthday, "%Y-%m-%d")
-    except:
-        raise HTTPException(status_code=400, detail="Invalid birthday format. Use MM-DD or YYYY-MM-DD")
+    bday = parse_birthday(birthday)
     
     customer.birthday = bday
     db.commit()
+    invalidate_birthdays()
     
     return {"message": "Birthday set", "birthday": bday.strftime("%m-%d")}
 
@@ -194,17 +323,23 @@ def set_customer_birthday(customer_id: int, birthday: str, db: Session = Depends
 def get_todays_birthdays(db: Session = Depends(get_db)):
     """Get customers with birthdays today"""
     today = datetime.now()
-    
-    # Find customers whose birthday month/day match today
+    return get_birthdays(today.date(), lambda: find_todays_birthdays(db, today))
+
+
+def find_todays_birthdays(db: Session, today: datetime) -> list:
+    """Birthday customers for `today`, read straight from the database"""
+    today_date, year = today.date(), today.year
+    # Same window as /upcoming, so Feb 29 birthdays reach Feb 28 in common years
     customers = db.query(Customer).filter(
-        Customer.birthday.isnot(None)
+        Customer.birthday.isnot(None),
+        birthday_window(today_date, today_date + timedelta(days=1))
     ).all()
     
     birthday_customers = []
     for c in customers:
-        if c.birthday and c.birthday.month == today.month and c.birthday.day == today.day:
+        if c.birthday and birthday_in_year(c.birthday, year) == today_date:
             # Check if they've used discount this year
-            discount_available = c.birthday_discount_used_year != today.year
+            discount_available = c.birthday_discount_used_year != year
             birthday_customers.append({
                 "id": c.id,
                 "name": c.name,
@@ -219,22 +354,26 @@ def get_todays_birthdays(db: Session = Depends(get_db)):
 @router.get("/birthdays/upcoming")
 def get_upcoming_birthdays(days: int = 7, db: Session = Depends(get_db)):
     """Get customers with birthdays in the next N days"""
-    from datetime import timedelta
     
     today = datetime.now()
-    customers = db.query(Customer).filter(
-        Customer.birthday.isnot(None)
-    ).all()
+    query = db.query(Customer).filter(Customer.birthday.isnot(None))
+    
+    # Narrow to the month/day window in SQL; the loop below does the exact check
+    if days + 1 < 365:
+        query = query.filter(birthday_window(today.date(), (today + timedelta(days=days + 1)).date()))
+    customers = query.all()
     
+    today_date = today.date()
+    year = today.year
     upcoming = []
     for c in customers:
         if c.birthday:
-            # Create this year's birthday date
-            this_year_bday = c.birthday.replace(year=today.year)
-            if this_year_bday < today:
-                this_year_bday = this_year_bday.replace(year=today.year + 1)
+            # Next occurrence of the birthday, counting today
+            this_year_bday = birthday_in_year(c.birthday, year)
+            if this_year_bday < today_date:
+                this_year_bday = birthday_in_year(c.birthday, year + 1)
             
-            days_until = (this_year_bday - today).days
+            days_until = (this_year_bday - today_date).days
             if 0 <= days_until <= days:
                 upcoming.append({
                     "id": c.id,
@@ -261,8 +400,8 @@ def use_birthday_discount(customer_id: int, db: Session = Depends(get_db)):
     today = datetime.now()
     
     # Check if it's their birthday month (give a week window)
-    bday_this_year = customer.birthday.replace(year=today.year)
-    days_diff = abs((today - bday_this_year).days)
+    bday_this_year = birthday_in_year(customer.birthday, today.year)
+    days_diff = abs((today.date() - bday_this_year).days)
     
     if days_diff > 7:
         raise HTTPException(status_code=400, detail="Birthday discount only valid within 7 days of birthday")
@@ -272,6 +411,7 @@ def use_birthday_discount(customer_id: int, db: Session = Depends(get_db)):
     
     customer.birthday_discount_used_year = today.year
     db.commit()
+    invalidate_birthdays()
     
     return {
         "message": "Birthday discount applied",
@@ -283,7 +423,6 @@ def use_birthday_discount(customer_id: int, db: Session = Depends(get_db)):
 @router.get("/{customer_id}/birthday-status")
 def get_birthday_status(customer_id: int, db: Session = Depends(get_db)):
     """Check if customer has birthday discount available"""
-    from datetime import timedelta
     
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
@@ -293,11 +432,13 @@ def get_birthday_status(customer_id: int, db: Session = Depends(get_db)):
         return {"has_birthday": False, "discount_available": False}
     
     today = datetime.now()
-    bday_this_year = customer.birthday.replace(year=today.year)
     
-    # Check if within 7 days of birthday
-    days_diff = (today - bday_this_year).days
-    is_birthday_window = -7 <= days_diff <= 7
+    # Check if within 7 days of birthday; two or more months apart never is
+    if abs(customer.birthday.month - today.month) > 1:
+        is_birthday_window = False
+    else:
+        days_diff = (today.date() - birthday_in_year(customer.birthday, today.year)).days
+        is_birthday_window = -7 <= days_diff <= 7
     
     discount_available = is_birthday_window and customer.birthday_discount_used_year != today.year
     
@@ -320,14 +461,23 @@ VIP_TIERS = {
     "platinum": {"min_spent": 1000, "min_visits": 30, "discount": 15, "points_multiplier": 2.0}
 }
 
+# Helper variable for tier order
+tier_order = ["bronze", "silver", "gold", "platinum"]
+TIER_RANK = {name: rank for rank, name in enumerate(tier_order)}
+# Highest requirements first, so the first tier that qualifies is the answer
+VIP_TIERS_DESCENDING = sorted(
+    VIP_TIERS.items(),
+    key=lambda item: (item[1]["min_spent"], item[1]["min_visits"]),
+    reverse=True
+)
+
 
 def calculate_vip_tier(total_spent: float, visit_count: int) -> str:
     """Calculate VIP tier based on spending and visits"""
-    tier = "bronze"
-    for tier_name, requirements in VIP_TIERS.items():
+    for tier_name, requirements in VIP_TIERS_DESCENDING:
         if total_spent >= requirements["min_spent"] and visit_count >= requirements["min_visits"]:
-            tier = tier_name
-    return tier
+            return tier_name
+    return "bronze"
 
 
 @router.get("/{customer_id}/vip-status")
@@ -341,8 +491,7 @@ def get_vip_status(customer_id: int, db: Session = Depends(get_db)):
     tier_benefits = VIP_TIERS.get(current_tier, VIP_TIERS["bronze"])
     
     # Calculate progress to next tier
-    tier_order = ["bronze", "silver", "gold", "platinum"]
-    current_index = tier_order.index(current_tier)
+    current_index = TIER_RANK[current_tier]
     
     next_tier = None
     next_tier_progress = None
@@ -405,7 +554,7 @@ def update_customer_tier(customer_id: int, db: Session = Depends(get_db)):
         "customer_id": customer.id,
         "old_tier": old_tier,
         "new_tier": new_tier,
-        "tier_upgraded": tier_changed and tier_order.index(new_tier) > tier_order.index(old_tier) if tier_changed else False,
+        "tier_upgraded": tier_changed and TIER_RANK[new_tier] > TIER_RANK[old_tier] if tier_changed else False,
         "benefits": VIP_TIERS[new_tier]
     }
 
@@ -437,25 +586,24 @@ def get_all_vip_customers(tier: Optional[str] = None, db: Session = Depends(get_
     ]
 
 
-@router.get("/vip/tiers")
-def get_vip_tier_info():
-    """Get VIP tier requirements and benefits"""
-    return {
-        "tiers": [
-            {
-                "name": name,
-                "min_spent": details["min_spent"],
-                "min_visits": details["min_visits"],
-                "discount_percent": details["discount"],
-                "points_multiplier": details["points_multiplier"]
-            }
-            for name, details in VIP_TIERS.items()
-        ]
-    }
+VIP_TIERS_RESPONSE = static_response({
+    "tiers": [
+        {
+            "name": name,
+            "min_spent": details["min_spent"],
+            "min_visits": details["min_visits"],
+            "discount_percent": details["discount"],
+            "points_multiplier": details["points_multiplier"]
+        }
+        for name, details in VIP_TIERS.items()
+    ]
+})
 
 
-# Helper variable for tier order
-tier_order = ["bronze", "silver", "gold", "platinum"]
+@router.get("/vip/tiers")
+async def get_vip_tier_info():
+    """Get VIP tier requirements and benefits"""
+    return VIP_TIERS_RESPONSE
 
 
 # ===== CUSTOMER TAGS/PREFERENCES =====
@@ -484,39 +632,57 @@ PREDEFINED_TAGS = [
 ]
 
 
+AVAILABLE_TAGS_RESPONSE = static_response({
+    "tags": PREDEFINED_TAGS,
+    "categories": {
+        "personality": ["prefers-quiet", "chatty"],
+        "demographics": ["senior", "student", "military", "first-responder"],
+        "payment": ["cash-only", "card-preferred"],
+        "booking": ["walk-in-regular", "appointment-only"],
+        "hair_type": ["sensitive-scalp", "thick-hair", "thinning-hair", "beard-enthusiast"],
+        "service": ["quick-service", "takes-time"],
+        "business": ["local-business", "influencer", "tips-well"]
+    }
+})
+
+
 @router.get("/tags/available")
-def get_available_tags():
+async def get_available_tags():
     """Get list of predefined tags"""
-    return {
-        "tags": PREDEFINED_TAGS,
-        "categories": {
-            "personality": ["prefers-quiet", "chatty"],
-            "demographics": ["senior", "student", "military", "first-responder"],
-            "payment": ["cash-only", "card-preferred"],
-            "booking": ["walk-in-regular", "appointment-only"],
-            "hair_type": ["sensitive-scalp", "thick-hair", "thinning-hair", "beard-enthusiast"],
-            "service": ["quick-service", "takes-time"],
-            "business": ["local-business", "influencer", "tips-well"]
-        }
-    }
+    return AVAILABLE_TAGS_RESPONSE
+
+
+def normalize_tag(tag: str) -> str:
+    """Lowercase, trimmed tag as stored in customer_tags; 400 if empty or it contains a comma"""
+    tag = tag.strip().lower()
+    if not tag or "," in tag:
+        raise HTTPException(status_code=400, detail="Tag must be non-empty and cannot contain commas")
+    return tag
 
 
 @router.post("/{customer_id}/tags/add")
 def add_customer_tag(customer_id: int, tag: str, db: Session = Depends(get_db)):
     """Add a tag to a customer"""
+    tag = normalize_tag(tag)
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    tag = tag.lower().strip()
     current_tags = customer.tags.split(",") if customer.tags else []
     
-    if tag in current_tags:
+    # customer_tags is authoritative; legacy CSV entries may differ in case
+    if db.get(CustomerTag, (customer_id, tag)):
         return {"message": "Tag already exists", "tags": current_tags}
     
     current_tags.append(tag)
     customer.tags = ",".join(current_tags)
-    db.commit()
+    db.add(CustomerTag(customer_id=customer_id, tag=tag))
+    try:
+        db.commit()
+    except IntegrityError:
+        # Added concurrently
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Tag already exists")
     
     return {"message": "Tag added", "tags": current_tags}
 
@@ -524,17 +690,21 @@ def add_customer_tag(customer_id: int, tag: str, db: Session = Depends(get_db)):
 @router.post("/{customer_id}/tags/remove")
 def remove_customer_tag(customer_id: int, tag: str, db: Session = Depends(get_db)):
     """Remove a tag from a customer"""
+    tag = normalize_tag(tag)
     customer = db.query(Customer).filter(Customer.id == customer_id).first()
     if not customer:
         raise HTTPException(status_code=404, detail="Customer not found")
     
-    tag = tag.lower().strip()
     current_tags = customer.tags.split(",") if customer.tags else []
     
-    if tag not in current_tags:
+    removed = db.query(CustomerTag).filter(
+        CustomerTag.customer_id == customer_id,
+        CustomerTag.tag == tag
+    ).delete(synchronize_session=False)
+    if not removed:
         return {"message": "Tag not found", "tags": current_tags}
     
-    current_tags.remove(tag)
+    current_tags = [t for t in current_tags if t.strip().lower() != tag]
     customer.tags = ",".join(current_tags) if current_tags else None
     db.commit()
     
@@ -563,9 +733,10 @@ def get_customers_by_tag(tag: str, db: Session = Depends(get_db)):
     """Get all customers with a specific tag"""
     tag = tag.lower().strip()
     
-    customers = db.query(Customer).filter(
-        Customer.tags.contains(tag)
-    ).all()
+    # Exact match through the tag index; a LIKE on the CSV also hit "student-athlete"
+    customers = db.query(Customer.id, Customer.name, Customer.phone, Customer.tags).join(
+        CustomerTag, CustomerTag.customer_id == Customer.id
+    ).filter(CustomerTag.tag == tag).all()
     
     return [
         {
@@ -800,7 +971,6 @@ def add_service_note(customer_id: int, data: ServiceNoteCreate, db: Session = De
     )
     db.add(note)
     db.commit()
-    db.refresh(note)
     
     return {"message": "Note added", "id": note.id}
 
@@ -808,7 +978,9 @@ def add_service_note(customer_id: int, data: ServiceNoteCreate, db: Session = De
 @router.get("/{customer_id}/service-notes")
 def get_service_notes(customer_id: int, service_type_id: Optional[int] = None, db: Session = Depends(get_db)):
     """Get all service notes for a customer"""
-    query = db.query(CustomerServiceNote).filter(
+    query = db.query(CustomerServiceNote).options(
+        joinedload(CustomerServiceNote.service_type)
+    ).filter(
         CustomerServiceNote.customer_id == customer_id
     )
     
@@ -834,7 +1006,9 @@ def get_service_notes(customer_id: int, service_type_id: Optional[int] = None, d
 @router.get("/{customer_id}/service-notes/important")
 def get_important_notes(customer_id: int, db: Session = Depends(get_db)):
     """Get important notes that should be shown before service"""
-    notes = db.query(CustomerServiceNote).filter(
+    notes = db.query(CustomerServiceNote).options(
+        joinedload(CustomerServiceNote.service_type)
+    ).filter(
         CustomerServiceNote.customer_id == customer_id,
         CustomerServiceNote.is_important == True
     ).all()
@@ -872,7 +1046,11 @@ def delete_service_note(customer_id: int, note_id: int, db: Session = Depends(ge
 @router.get("/{customer_id}/service-history")
 def get_service_history(customer_id: int, limit: int = 10, db: Session = Depends(get_db)):
     """Get customer's service history with notes"""
-    orders = db.query(Order).filter(
+    # Barber, line items and their service types come back in the same statement
+    orders = db.query(Order).options(
+        joinedload(Order.barber),
+        joinedload(Order.services).joinedload(OrderService.service_type)
+    ).filter(
         Order.customer_id == customer_id,
         Order.status == "completed"
     ).order_by(Order.completed_at.desc()).limit(limit).all()
@@ -881,15 +1059,14 @@ def get_service_history(customer_id: int, limit: int = 10, db: Session = Depends
     for order in orders:
         services = []
         for os in order.services:
-            service = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
+            service = os.service_type
             services.append({
                 "service_name": service.name if service else "Unknown",
                 "price": os.unit_price,
                 "notes": os.notes
             })
         
-        from app.models import Barber
-        barber = db.query(Barber).filter(Barber.id == order.barber_id).first() if order.barber_id else None
+        barber = order.barber
         
         history.append({
             "order_id": order.id,
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy import func
 from datetime import datetime, date, timedelta
 
 from app.database import get_db
 from app.models import (
     Order, Customer, Barber, WalkInQueue, Appointment, 
-    CustomerMembership, Product, ServiceType
+    CustomerMembership, Product, ServiceType, BarberBreak
 )
 
 router = APIRouter(prefix="/dashboard", tags=["Dashboard"])
@@ -35,8 +35,10 @@ def get_dashboard(db: Session = Depends(get_db)):
     active_barbers = db.query(Barber).filter(Barber.is_available == True).count()
     
     # Appointments today
+    day_start = datetime.combine(today, datetime.min.time())
     appointments_today = db.query(Appointment).filter(
-        func.date(Appointment.scheduled_time) == today,
+        Appointment.scheduled_time >= day_start,
+        Appointment.scheduled_time < day_start + timedelta(days=1),
         Appointment.status.in_(["scheduled", "confirmed"])
     ).count()
     
@@ -133,8 +135,10 @@ def get_business_insights(db: Session = Depends(get_db)):
         })
     
     # Check upcoming appointments
+    day_start = datetime.combine(today, datetime.min.time())
     upcoming = db.query(Appointment).filter(
-        func.date(Appointment.scheduled_time) == today,
+        Appointment.scheduled_time >= day_start,
+        Appointment.scheduled_time < day_start + timedelta(days=1),
         Appointment.status == "scheduled"
     ).count()
     
@@ -256,7 +260,12 @@ def get_live_status(db: Session = Depends(get_db)):
     now = datetime.now()
     
     # Current queue
-    queue = db.query(WalkInQueue).filter(
+    queue = db.query(WalkInQueue).options(
+        load_only(
+            WalkInQueue.position, WalkInQueue.customer_name,
+            WalkInQueue.check_in_time, WalkInQueue.requested_barber_id,
+        )
+    ).filter(
         WalkInQueue.status.in_(["waiting", "called"])
     ).order_by(WalkInQueue.position).all()
     
@@ -285,7 +294,6 @@ def get_live_status(db: Session = Depends(get_db)):
                 time_in_service = int((now - current_order.started_at).total_seconds() / 60)
         elif not barber.is_available:
             # Check if on break
-            from app.models import BarberBreak
             active_break = db.query(BarberBreak).filter(
                 BarberBreak.barber_id == barber.id,
                 BarberBreak.end_time.is_(None)
@@ -305,7 +313,12 @@ def get_live_status(db: Session = Depends(get_db)):
         })
     
     # Upcoming appointments (next 2 hours)
-    upcoming = db.query(Appointment).filter(
+    upcoming = db.query(Appointment).options(
+        load_only(
+            Appointment.customer_name, Appointment.scheduled_time,
+            Appointment.barber_id, Appointment.service_type_id,
+        )
+    ).filter(
         Appointment.scheduled_time >= now,
         Appointment.scheduled_time <= now + timedelta(hours=2),
         Appointment.status.in_(["scheduled", "confirmed"])
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from datetime import datetime, date
 
 from app.database import get_db
-from app.models import Discount, DiscountUsage, Customer
+from app.models import Discount, DiscountUsage, Customer, Order
 
 router = APIRouter(prefix="/discounts", tags=["discounts"])
 
@@ -110,7 +110,6 @@ def create_discount(discount: DiscountCreate, db: Session = Depends(get_db)):
     )
     db.add(db_discount)
     db.commit()
-    db.refresh(db_discount)
     
     return {
         "id": db_discount.id,
@@ -160,7 +159,6 @@ def apply_discount(request: ApplyDiscountRequest, db: Session = Depends(get_db))
         
         # Check first visit only
         if discount.first_visit_only:
-            from app.models import Order
             previous_orders = db.query(Order).filter(
                 Order.customer_id == request.customer_id,
                 Order.status == "completed"
@@ -72,7 +72,6 @@ def create_gift_card(card: GiftCardCreate, db: Session = Depends(get_db)):
     )
     db.add(gift_card)
     db.commit()
-    db.refresh(gift_card)
     
     # Record initial transaction
     transaction = GiftCardTransaction(
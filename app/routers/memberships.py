@@ -68,7 +68,6 @@ def create_plan(plan: PlanCreate, db: Session = Depends(get_db)):
     db_plan = MembershipPlan(**plan.model_dump())
     db.add(db_plan)
     db.commit()
-    db.refresh(db_plan)
     
     return {"message": "Plan created", "id": db_plan.id}
 
@@ -121,7 +120,6 @@ def subscribe_customer(data: MembershipSubscribe, db: Session = Depends(get_db))
     )
     db.add(membership)
     db.commit()
-    db.refresh(membership)
     
     return {
         "message": "Membership activated",
@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from datetime import datetime
 
 from app.database import get_db
-from app.models import Order, OrderService, ServiceType, Customer, Barber
+from app.cache import get_service, get_barber
+from app.models import Order, OrderService, Customer
 
 router = APIRouter(prefix="/orders", tags=["orders"])
 
@@ -46,6 +47,10 @@ class OrderResponse(BaseModel):
         from_attributes = True
 
 
+# Compiled once; validates and dumps a whole page of orders in one call
+ORDER_LIST_ADAPTER = TypeAdapter(List[OrderResponse])
+
+
 @router.get("/", response_model=List[OrderResponse])
 def list_orders(
     status: Optional[str] = None,
@@ -62,7 +67,7 @@ def list_orders(
     orders = query.order_by(Order.created_at.desc()).limit(limit).all()
     
     result = []
-    for order in orders:
+    for order, row in zip(orders, ORDER_LIST_ADAPTER.dump_python(ORDER_LIST_ADAPTER.validate_python(orders))):
         customer_name = None
         if order.customer:
             customer_name = order.customer.name
@@ -72,7 +77,7 @@ def list_orders(
         
         services = []
         for os in order.services:
-            svc = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
+            svc = get_service(db, os.service_type_id)
             services.append({
                 "id": os.id,
                 "service_type_id": os.service_type_id,
@@ -83,7 +88,7 @@ def list_orders(
             })
         
         result.append({
-            **OrderResponse.model_validate(order).model_dump(),
+            **row,
             "customer_name": customer_name,
             "barber_name": barber_name,
             "services": services
@@ -107,7 +112,7 @@ def get_order(order_id: int, db: Session = Depends(get_db)):
     
     services = []
     for os in order.services:
-        svc = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
+        svc = get_service(db, os.service_type_id)
         services.append({
             "id": os.id,
             "service_type_id": os.service_type_id,
@@ -143,7 +148,7 @@ def create_order(order_data: OrderCreate, db: Session = Depends(get_db)):
     service_items = []
     
     for svc in order_data.services:
-        service = db.query(ServiceType).filter(ServiceType.id == svc.service_type_id).first()
+        service = get_service(db, svc.service_type_id)
         if not service:
             raise HTTPException(status_code=400, detail=f"Service {svc.service_type_id} not found")
         
@@ -214,7 +219,7 @@ def assign_barber(order_id: int, barber_id: int, db: Session = Depends(get_db)):
     if not order:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    barber = db.query(Barber).filter(Barber.id == barber_id).first()
+    barber = get_barber(db, barber_id)
     if not barber:
         raise HTTPException(status_code=404, detail="Barber not found")
     
@@ -245,7 +250,7 @@ def get_receipt(order_id: int, db: Session = Depends(get_db)):
     
     services = []
     for os in order.services:
-        svc = db.query(ServiceType).filter(ServiceType.id == os.service_type_id).first()
+        svc = get_service(db, os.service_type_id)
         services.append({
             "name": svc.name if svc else "Unknown",
             "quantity": os.quantity,
@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.database import get_db
-from app.models import ServicePackage, PackageService, ServiceType, Customer
+from app.models import ServicePackage, PackageService, ServiceType, Customer, CustomerPackage
 
 router = APIRouter(prefix="/packages", tags=["packages"])
 
@@ -119,7 +119,6 @@ def create_package(package: PackageCreate, db: Session = Depends(get_db)):
         db.add(ps)
     
     db.commit()
-    db.refresh(pkg)
     
     savings = original_value - package.price
     
@@ -150,7 +149,6 @@ def purchase_package(
         raise HTTPException(status_code=404, detail="Customer not found")
     
     # Create customer package record
-    from app.models import CustomerPackage
     
     customer_pkg = CustomerPackage(
         customer_id=customer_id,
@@ -160,7 +158,6 @@ def purchase_package(
     )
     db.add(customer_pkg)
     db.commit()
-    db.refresh(customer_pkg)
     
     return {
         "id": customer_pkg.id,
@@ -175,7 +172,6 @@ def purchase_package(
 @router.get("/customer/{customer_id}")
 def get_customer_packages(customer_id: int, db: Session = Depends(get_db)):
     """Get all packages owned by a customer"""
-    from app.models import CustomerPackage
     
     packages = db.query(CustomerPackage).filter(
         CustomerPackage.customer_id == customer_id,
@@ -210,7 +206,6 @@ def get_customer_packages(customer_id: int, db: Session = Depends(get_db)):
 @router.post("/redeem/{customer_package_id}")
 def redeem_package(customer_package_id: int, db: Session = Depends(get_db)):
     """Redeem one use of a customer's package"""
-    from app.models import CustomerPackage
     
     customer_pkg = db.query(CustomerPackage).filter(CustomerPackage.id == customer_package_id).first()
     if not customer_pkg:
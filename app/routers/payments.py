@@ -5,7 +5,7 @@ from pydantic import BaseModel
 from datetime import datetime
 
 from app.database import get_db
-from app.models import Payment, Order
+from app.models import Payment, Order, PaymentMethod
 
 router = APIRouter(prefix="/payments", tags=["payments"])
 
@@ -22,11 +22,11 @@ class PaymentCreate(BaseModel):
     order_id: int
     amount: float
     tip_amount: float = 0.0
-    method: str = "card"
+    method: PaymentMethod = PaymentMethod.CARD
 
 
 class SplitPayment(BaseModel):
-    method: str
+    method: PaymentMethod
     amount: float
     tip_amount: float = 0.0
 
@@ -155,7 +155,6 @@ def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     db_product = Product(**product.model_dump())
     db.add(db_product)
     db.commit()
-    db.refresh(db_product)
     
     # Log initial stock if any
     if product.stock_quantity > 0:
@@ -3,10 +3,10 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import Optional
 from pydantic import BaseModel
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from app.database import get_db
-from app.models import WalkInQueue, Customer, Barber, ServiceType
+from app.models import WalkInQueue, Customer, Barber, ServiceType, Order, TimeClock
 
 router = APIRouter(prefix="/queue", tags=["queue"])
 
@@ -97,7 +97,6 @@ def add_to_queue(entry: QueueEntryCreate, db: Session = Depends(get_db)):
     )
     db.add(queue_entry)
     db.commit()
-    db.refresh(queue_entry)
     
     return {
         "id": queue_entry.id,
@@ -215,8 +214,6 @@ def get_queue_stats(db: Session = Depends(get_db)):
 @router.get("/wait-times")
 def get_detailed_wait_times(db: Session = Depends(get_db)):
     """Get detailed wait time analysis with historical data"""
-    from datetime import timedelta
-    from app.models import Order, TimeClock
     
     now = datetime.utcnow()
     today = now.date()
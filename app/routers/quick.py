@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime
@@ -7,7 +8,7 @@ from datetime import datetime
 from app.database import get_db
 from app.models import (
     Customer, Order, OrderService, ServiceType, Barber, 
-    WalkInQueue, Payment, LoyaltyTransaction
+    WalkInQueue, Payment, PaymentMethod, LoyaltyTransaction
 )
 
 router = APIRouter(prefix="/quick", tags=["Quick Actions"])
@@ -23,7 +24,7 @@ class QuickWalkIn(BaseModel):
 
 class QuickCheckout(BaseModel):
     order_id: int
-    payment_method: str = "card"
+    payment_method: PaymentMethod = PaymentMethod.CARD
     tip_percent: float = 20.0
 
 
@@ -32,7 +33,6 @@ class QuickCheckout(BaseModel):
 @router.post("/walkin")
 def quick_walkin(data: QuickWalkIn, db: Session = Depends(get_db)):
     """Quick add walk-in customer - creates queue entry and order in one step"""
-    from sqlalchemy import func
     
     # Look up or create customer
     customer = None
@@ -42,7 +42,6 @@ def quick_walkin(data: QuickWalkIn, db: Session = Depends(get_db)):
             customer = Customer(name=data.customer_name, phone=data.phone)
             db.add(customer)
             db.commit()
-            db.refresh(customer)
     
     # Get service
     service = db.query(ServiceType).filter(ServiceType.id == data.service_id).first()
@@ -71,7 +70,6 @@ def quick_walkin(data: QuickWalkIn, db: Session = Depends(get_db)):
     )
     db.add(queue_entry)
     db.commit()
-    db.refresh(queue_entry)
     
     return {
         "success": True,
@@ -110,7 +108,6 @@ def quick_start_service(queue_id: int, barber_id: int, db: Session = Depends(get
     )
     db.add(order)
     db.commit()
-    db.refresh(order)
     
     # Add service
     order_service = OrderService(
@@ -256,7 +253,6 @@ def quick_customer_lookup(phone: str, db: Session = Depends(get_db)):
 @router.get("/today")
 def get_today_summary(db: Session = Depends(get_db)):
     """Quick summary of today's activity"""
-    from sqlalchemy import func
     
     today = datetime.now().date()
     
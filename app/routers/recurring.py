@@ -1,10 +1,14 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, contains_eager
+from sqlalchemy import and_, or_
+from sqlalchemy.exc import IntegrityError
 from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, timedelta
 
 from app.database import get_db
+from app.cache import invalidate_slots
+from app.routers.appointments import BOOKED_STATUSES, bulk_create_appointments
 from app.models import RecurringAppointment, Appointment, Customer, Barber, ServiceType
 
 router = APIRouter(prefix="/recurring", tags=["Recurring Appointments"])
@@ -32,7 +36,14 @@ class RecurringUpdate(BaseModel):
 @router.get("/")
 def list_recurring_appointments(active_only: bool = True, db: Session = Depends(get_db)):
     """Get all recurring appointment templates"""
-    query = db.query(RecurringAppointment)
+    # Many-to-one joins: one row per template, names loaded in the same query
+    query = db.query(RecurringAppointment).outerjoin(RecurringAppointment.customer).outerjoin(
+        RecurringAppointment.barber
+    ).outerjoin(RecurringAppointment.service_type).options(
+        contains_eager(RecurringAppointment.customer),
+        contains_eager(RecurringAppointment.barber),
+        contains_eager(RecurringAppointment.service_type)
+    )
     
     if active_only:
         query = query.filter(RecurringAppointment.is_active == True)
@@ -65,7 +76,12 @@ def list_recurring_appointments(active_only: bool = True, db: Session = Depends(
 @router.get("/customer/{customer_id}")
 def get_customer_recurring(customer_id: int, db: Session = Depends(get_db)):
     """Get recurring appointments for a customer"""
-    recurring = db.query(RecurringAppointment).filter(
+    recurring = db.query(RecurringAppointment).outerjoin(RecurringAppointment.barber).outerjoin(
+        RecurringAppointment.service_type
+    ).options(
+        contains_eager(RecurringAppointment.barber),
+        contains_eager(RecurringAppointment.service_type)
+    ).filter(
         RecurringAppointment.customer_id == customer_id,
         RecurringAppointment.is_active == True
     ).all()
@@ -111,7 +127,6 @@ def create_recurring_appointment(data: RecurringCreate, db: Session = Depends(ge
     )
     db.add(recurring)
     db.commit()
-    db.refresh(recurring)
     
     # Generate appointments
     appointments_created = generate_appointments(
@@ -133,7 +148,6 @@ def generate_appointments(
     service: ServiceType
 ) -> int:
     """Generate individual appointments from recurring template"""
-    created = 0
     current = recurring.start_date
     end_limit = current + timedelta(weeks=weeks)
     
@@ -143,6 +157,22 @@ def generate_appointments(
     # Parse time
     hour, minute = map(int, recurring.time_of_day.split(":"))
     
+    # Times the customer already has, or the barber is already booked for, in one query
+    conflict = Appointment.customer_id == customer.id
+    if recurring.barber_id:
+        conflict = or_(conflict, and_(
+            Appointment.barber_id == recurring.barber_id,
+            Appointment.status.in_(BOOKED_STATUSES)
+        ))
+    taken = {
+        scheduled_time for (scheduled_time,) in db.query(Appointment.scheduled_time).filter(
+            Appointment.scheduled_time >= current,
+            Appointment.scheduled_time < end_limit + timedelta(days=1),
+            conflict
+        )
+    }
+    
+    rows = []
     while current <= end_limit:
         # Check if this day matches the pattern
         should_create = False
@@ -164,31 +194,30 @@ def generate_appointments(
         if should_create:
             scheduled_time = current.replace(hour=hour, minute=minute, second=0, microsecond=0)
             
-            # Check if appointment already exists
-            existing = db.query(Appointment).filter(
-                Appointment.customer_id == customer.id,
-                Appointment.scheduled_time == scheduled_time
-            ).first()
-            
-            if not existing:
-                appointment = Appointment(
-                    customer_id=customer.id,
-                    customer_name=customer.name,
-                    customer_phone=customer.phone,
-                    barber_id=recurring.barber_id,
-                    service_type_id=recurring.service_type_id,
-                    scheduled_time=scheduled_time,
-                    duration_minutes=service.duration_minutes,
-                    recurring_id=recurring.id,
-                    status="scheduled"
-                )
-                db.add(appointment)
-                created += 1
+            if scheduled_time not in taken:
+                rows.append({
+                    "customer_id": customer.id,
+                    "customer_name": customer.name,
+                    "customer_phone": customer.phone,
+                    "barber_id": recurring.barber_id,
+                    "service_type_id": recurring.service_type_id,
+                    "scheduled_time": scheduled_time,
+                    "duration_minutes": service.duration_minutes,
+                    "recurring_id": recurring.id,
+                    "status": "scheduled"
+                })
         
         current += timedelta(days=1)
     
-    db.commit()
-    return created
+    # A slot booked since the taken query trips uq_appointments_barber_slot
+    try:
+        bulk_create_appointments(db, rows)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Time slot not available")
+    invalidate_slots()
+    return len(rows)
 
 
 @router.post("/{recurring_id}/generate")
@@ -273,6 +302,7 @@ def cancel_recurring(recurring_id: int, cancel_future: bool = True, db: Session
             cancelled_count += 1
     
     db.commit()
+    invalidate_slots()
     
     return {
         "message": "Recurring appointment cancelled",
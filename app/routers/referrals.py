@@ -1,5 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from pydantic import BaseModel
 from typing import Optional
 from datetime import datetime
@@ -73,7 +74,6 @@ def get_or_create_referral_code(customer_id: int, db: Session = Depends(get_db))
     )
     db.add(referral)
     db.commit()
-    db.refresh(referral)
     
     return {
         "referral_code": referral.referral_code,
@@ -211,7 +211,6 @@ def get_referral_history(customer_id: int, db: Session = Depends(get_db)):
 @router.get("/leaderboard")
 def get_referral_leaderboard(limit: int = 10, db: Session = Depends(get_db)):
     """Get top referrers"""
-    from sqlalchemy import func
     
     # Get counts of successful referrals per customer
     results = db.query(
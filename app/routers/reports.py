@@ -5,7 +5,10 @@ from datetime import datetime, date, timedelta
 from typing import Optional
 
 from app.database import get_db
-from app.models import Order, Payment, Barber, ServiceType, OrderService, Customer, RevenueTarget
+from app.models import (
+    Order, Payment, Barber, ServiceType, OrderService, Customer, RevenueTarget,
+    WalkInQueue, TimeClock
+)
 from pydantic import BaseModel
 
 router = APIRouter(prefix="/reports", tags=["reports"])
@@ -397,7 +400,6 @@ def create_target(target: TargetCreate, db: Session = Depends(get_db)):
     )
     db.add(db_target)
     db.commit()
-    db.refresh(db_target)
     
     return {"message": "Target created", "id": db_target.id}
 
@@ -622,7 +624,6 @@ def set_default_daily_target(amount: float, db: Session = Depends(get_db)):
 @router.get("/performance/{barber_id}/detailed")
 def get_detailed_performance(barber_id: int, days: int = 30, db: Session = Depends(get_db)):
     """Get detailed performance metrics for a barber"""
-    from app.models import WalkInQueue, TimeClock
     
     barber = db.query(Barber).filter(Barber.id == barber_id).first()
     if not barber:
@@ -804,7 +805,6 @@ def get_efficiency_metrics(db: Session = Depends(get_db)):
     avg_wait_time = total_wait_time / total_services if total_services > 0 else 0
     
     # Active barber hours
-    from app.models import TimeClock
     timeclock = db.query(TimeClock).filter(
         func.date(TimeClock.clock_in) >= week_start
     ).all()
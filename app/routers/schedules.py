@@ -4,7 +4,7 @@ from pydantic import BaseModel
 from typing import Optional, List
 from datetime import datetime, time
 from app.database import SessionLocal
-from app.models import BarberSchedule, Barber
+from app.models import BarberSchedule, Barber, BarberDayOff
 
 router = APIRouter(prefix="/schedules", tags=["Barber Schedules"])
 
@@ -94,7 +94,6 @@ def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
     )
     db.add(db_schedule)
     db.commit()
-    db.refresh(db_schedule)
     
     return {"message": "Schedule created", "id": db_schedule.id}
 
@@ -152,7 +151,6 @@ def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
 @router.post("/day-off")
 def add_day_off(day_off: DayOffCreate, db: Session = Depends(get_db)):
     """Add a day off for a barber"""
-    from app.models import BarberDayOff
     
     off_date = datetime.strptime(day_off.date, "%Y-%m-%d").date()
     
@@ -172,7 +170,6 @@ def add_day_off(day_off: DayOffCreate, db: Session = Depends(get_db)):
     )
     db.add(db_off)
     db.commit()
-    db.refresh(db_off)
     
     return {"message": "Day off added", "id": db_off.id}
 
@@ -180,7 +177,6 @@ def add_day_off(day_off: DayOffCreate, db: Session = Depends(get_db)):
 @router.get("/days-off/{barber_id}")
 def get_days_off(barber_id: int, db: Session = Depends(get_db)):
     """Get all days off for a barber"""
-    from app.models import BarberDayOff
     
     days_off = db.query(BarberDayOff).filter(
         BarberDayOff.barber_id == barber_id,
@@ -200,7 +196,6 @@ def get_days_off(barber_id: int, db: Session = Depends(get_db)):
 @router.delete("/day-off/{day_off_id}")
 def remove_day_off(day_off_id: int, db: Session = Depends(get_db)):
     """Remove a day off"""
-    from app.models import BarberDayOff
     
     day_off = db.query(BarberDayOff).filter(BarberDayOff.id == day_off_id).first()
     if not day_off:
@@ -214,7 +209,6 @@ def remove_day_off(day_off_id: int, db: Session = Depends(get_db)):
 @router.get("/available-today")
 def get_available_barbers_today(db: Session = Depends(get_db)):
     """Get all barbers available today with their hours"""
-    from app.models import BarberDayOff
     
     today = datetime.now()
     day_of_week = today.weekday()
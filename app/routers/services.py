@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from typing import List, Optional
 from pydantic import BaseModel
 from datetime import datetime
 
 from app.database import get_db
-from app.models import ServiceType
+from app.cache import invalidate_services
+from app.models import ServiceType, OrderService
 
 router = APIRouter(prefix="/services", tags=["services"])
 
@@ -137,6 +139,7 @@ def create_service(service: ServiceCreate, db: Session = Depends(get_db)):
     db_service = ServiceType(**service.model_dump())
     db.add(db_service)
     db.commit()
+    invalidate_services()
     db.refresh(db_service)
     return db_service
 
@@ -152,6 +155,7 @@ def update_service(service_id: int, service: ServiceUpdate, db: Session = Depend
         setattr(db_service, field, value)
     
     db.commit()
+    invalidate_services()
     db.refresh(db_service)
     return db_service
 
@@ -204,6 +208,7 @@ def set_peak_pricing(service_id: int, peak_price: float, off_peak_price: Optiona
         service.off_peak_price = off_peak_price
     
     db.commit()
+    invalidate_services()
     
     return {
         "message": "Pricing updated",
@@ -226,6 +231,7 @@ def bulk_update_pricing(peak_multiplier: float = 1.1, off_peak_multiplier: float
         updated += 1
     
     db.commit()
+    invalidate_services()
     
     return {
         "message": f"Updated pricing for {updated} services",
@@ -348,8 +354,6 @@ def set_service_upsells(
 @router.get("/addons/popular")
 def get_popular_addons(db: Session = Depends(get_db)):
     """Get most popular add-on services"""
-    from app.models import OrderService
-    from sqlalchemy import func
     
     # Get add-on category services
     addons = db.query(ServiceType).filter(